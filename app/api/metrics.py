@@ -0,0 +1,40 @@
+from utils.metrics import Counter, Histogram
+
+REQUEST_SECONDS = Histogram('churn_request_duration_seconds', 'Total request handling time', ['endpoint'])
+PARSE_SECONDS = Histogram('churn_request_parse_seconds', 'Time spent reading and parsing the request body', ['endpoint'])
+VALIDATE_SECONDS = Histogram('churn_validate_seconds', 'Time spent validating customer records', ['endpoint'])
+SERIALIZE_SECONDS = Histogram('churn_serialize_seconds', 'Time spent serializing the response', ['endpoint'])
+REQUESTS_TOTAL = Counter('churn_requests_total', 'Requests handled by endpoint and status code', ['endpoint', 'status'])
+ERRORS_TOTAL = Counter('churn_errors_total', 'Failed requests by endpoint and reason', ['endpoint', 'reason'])
+
+# Error reason reported for each non-2xx status code
+ERROR_REASONS = {400: 'invalid_request', 413: 'too_large', 503: 'overloaded', 500: 'internal'}
+# A summary's "reason" field overrides it, e.g. 'not_ready' for 503s sent before the model is loaded
+
+# Request summary fields (milliseconds) and the histogram each one feeds
+_STAGE_HISTOGRAMS = (
+    ('total_ms', REQUEST_SECONDS),
+    ('parse_ms', PARSE_SECONDS),
+    ('validate_ms', VALIDATE_SECONDS),
+    ('serialize_ms', SERIALIZE_SECONDS),
+)
+
+
+def record_request(summary: dict):
+    """
+    Record the metrics of one request from its summary event.
+
+    Transform and model timings are recorded by the Predictor itself, since
+    coalesced requests share those calls.
+
+    Args:
+        summary (dict): The per-request summary built by the endpoint
+    """
+    endpoint = summary["endpoint"]
+    for field, histogram in _STAGE_HISTOGRAMS:
+        if field in summary:
+            histogram.labels(endpoint).observe(summary[field] / 1000)
+    status = summary["status"]
+    REQUESTS_TOTAL.labels(endpoint, str(status)).inc()
+    if status >= 400:
+        ERRORS_TOTAL.labels(endpoint, summary.get("reason") or ERROR_REASONS.get(status, 'other')).inc()
@@ -1,5 +1,17 @@
+import json
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    # pandas is imported by the batch helpers on first use, keeping it off the API's import path
+    import pandas as pd
+
+VALID_CONTRACTS = ['Month-to-month', 'One year', 'Two year']
+VALID_PHONE_SERVICE = ['Yes', 'No']
+NUMERIC_FIELDS = ['TotalCharges', 'tenure']
+CUSTOMER_FIELDS = ['TotalCharges', 'Contract', 'PhoneService', 'tenure']
+# Content types accepted as one JSON customer per line by the batch endpoints
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
 
 @dataclass
 class CustomerData:
@@ -10,12 +22,142 @@ class CustomerData:
 
     def validate(self) -> tuple[bool, Optional[str]]:
         """Validate the input data"""
-        if self.Contract not in ['Month-to-month', 'One year', 'Two year']:
+        if self.Contract not in VALID_CONTRACTS:
             return False, "Contract must be one of: Month-to-month, One year, Two year"
-        if self.PhoneService not in ['Yes', 'No']:
+        if self.PhoneService not in VALID_PHONE_SERVICE:
             return False, "PhoneService must be either 'Yes' or 'No'"
         if self.TotalCharges < 0:
             return False, "TotalCharges cannot be negative"
         if self.tenure < 0:
             return False, "tenure cannot be negative"
-        return True, None 
\ No newline at end of file
+        return True, None
+
+    @classmethod
+    def from_json(cls, data: dict) -> "CustomerData":
+        """Build a customer from a /predict request body, with the endpoint's defaults for missing fields."""
+        return cls(
+            TotalCharges=float(data.get('TotalCharges', 0)),
+            Contract=data.get('Contract', ''),
+            PhoneService=data.get('PhoneService', ''),
+            tenure=float(data.get('tenure', 0))
+        )
+
+
+def records_to_frame(records: list) -> "tuple[pd.DataFrame, pd.Series]":
+    """
+    Build a customer DataFrame from a list of request records and validate it in one pass.
+
+    Missing fields get the same defaults as the single-record endpoint (0 for numbers,
+    empty string for categories). Rows that are not JSON objects or carry non-numeric
+    values are reported as errors instead of failing the whole batch.
+
+    Args:
+        records (list): Parsed request records, one per customer
+
+    Returns:
+        tuple[pd.DataFrame, pd.Series]: The customer frame with CUSTOMER_FIELDS columns and
+            a Series holding an error message per row (null for valid rows)
+    """
+    import pandas as pd
+    is_object = [isinstance(record, dict) for record in records]
+    df = pd.DataFrame.from_records(
+        [record if ok else {} for record, ok in zip(records, is_object)],
+        columns=CUSTOMER_FIELDS
+    )
+    errors = pd.Series(None, index=df.index, dtype=object)
+    errors[~pd.Series(is_object, index=df.index)] = "Row must be a JSON object"
+
+    for field in NUMERIC_FIELDS:
+        raw = df[field]
+        numeric = pd.to_numeric(raw, errors='coerce')
+        bad = numeric.isna() & raw.notna()
+        errors[bad & errors.isna()] = f"{field} must be a number"
+        df[field] = numeric.fillna(0).astype(float)
+
+    for field in ['Contract', 'PhoneService']:
+        df[field] = df[field].where(df[field].notna(), '')
+
+    return df, validate_frame(df, errors)
+
+
+def validate_frame(df: "pd.DataFrame", errors: "Optional[pd.Series]" = None) -> "pd.Series":
+    """
+    Vectorized equivalent of CustomerData.validate over a whole DataFrame.
+
+    Args:
+        df (pd.DataFrame): Customer frame with CUSTOMER_FIELDS columns
+        errors (Optional[pd.Series]): Errors already found for some rows; these are kept
+
+    Returns:
+        pd.Series: Error message per row, null where the row is valid
+    """
+    if errors is None:
+        import pandas as pd
+        errors = pd.Series(None, index=df.index, dtype=object)
+    checks = [
+        (~df['Contract'].isin(VALID_CONTRACTS), "Contract must be one of: Month-to-month, One year, Two year"),
+        (~df['PhoneService'].isin(VALID_PHONE_SERVICE), "PhoneService must be either 'Yes' or 'No'"),
+        (df['TotalCharges'] < 0, "TotalCharges cannot be negative"),
+        (df['tenure'] < 0, "tenure cannot be negative"),
+    ]
+    for mask, message in checks:
+        errors[mask & errors.isna()] = message
+    return errors
+
+
+def parse_ndjson(text: str) -> list:
+    """
+    Parse an NDJSON body, one customer per line.
+
+    Lines that fail to parse are kept as None so they get a per-row error.
+    """
+    records = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            records.append(None)
+    return records
+
+
+def batch_payload_records(data) -> list:
+    """
+    Extract the customer list from a parsed batch body: a JSON array or an object with a "customers" array.
+
+    Raises:
+        ValueError: If the body holds no customer array
+    """
+    if isinstance(data, dict):
+        data = data.get('customers')
+    if not isinstance(data, list):
+        raise ValueError("Request body must be a JSON array of customers")
+    return data
+
+
+def batch_results(valid: "pd.Series", errors: "pd.Series", predictions) -> list:
+    """
+    Per-row batch response entries, in request order.
+
+    Args:
+        valid (pd.Series): True for rows that were scored
+        errors (pd.Series): Error message per row, null for valid rows
+        predictions: Predictions of the valid rows, in order
+
+    Returns:
+        list: A prediction or an error entry per row
+    """
+    results = []
+    scored = iter(predictions)
+    for index, (ok, error) in enumerate(zip(valid, errors)):
+        if ok:
+            prediction = int(next(scored))
+            results.append({
+                'index': index,
+                'prediction': prediction,
+                'churn_status': 'Churn' if prediction == 1 else 'No Churn'
+            })
+        else:
+            results.append({'index': index, 'error': error})
+    return results
@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from writer.db_writer import DBWriter
+from utils.db import database_params_from_env
+
+def make_predictions(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'predict_result': rng.integers(0, 2, size=rows)
+    })
+
+def time_write(writer: DBWriter, table_name: str, write) -> float:
+    with writer.engine.connect() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {table_name}"))
+        connection.commit()
+    writer._created_tables.discard(table_name)
+    started = time.perf_counter()
+    write()
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare DataFrame.to_sql with the COPY writer")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--table', default='prediction_results_bench')
+    args = parser.parse_args()
+
+    writer = DBWriter(**database_params_from_env())
+
+    print(f"{'rows':>10} {'to_sql (s)':>12} {'copy (s)':>10} {'copy+upsert (s)':>16} {'rerun upsert (s)':>17}")
+    for rows in args.rows:
+        df = make_predictions(rows)
+        to_sql = time_write(writer, args.table, lambda: writer.write_predictions(df.copy(), args.table))
+        copy = time_write(writer, args.table, lambda: writer.write_predictions_copy(df, args.table, upsert=False))
+        upsert = time_write(writer, args.table, lambda: writer.write_predictions_copy(df, args.table, upsert=True))
+        # Second upsert over existing ids, the case that fails with to_sql today
+        started = time.perf_counter()
+        writer.write_predictions_copy(df, args.table, upsert=True)
+        rerun = time.perf_counter() - started
+        print(f"{rows:>10} {to_sql:>12.3f} {copy:>10.3f} {upsert:>16.3f} {rerun:>17.3f}")
+
+    with writer.engine.connect() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {args.table}"))
+        connection.commit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Import-time budget check for the API and batch entry points.
+
+Each entry point is imported in a fresh interpreter with MODEL_WARMUP=off. The
+check fails when the median import takes longer than the budget, or when the
+import pulls in a module that must stay lazy (pandas, scikit-learn, SQLAlchemy...).
+Each API then runs one real background warm-up, with INFO logging, and the check
+fails unless GET /ready answers 200 within --warmup-timeout seconds.
+
+    python benchmarks/bench_startup.py                      # from app/
+    python benchmarks/bench_startup.py --budget-ms 300 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ('main_api', 'main_asgi', 'churn_score')
+# Loaded by the model warm-up or by the sources and sinks that need them, never at import
+LAZY_MODULES = ('pandas', 'numpy', 'sklearn', 'scipy', 'sqlalchemy', 'psycopg2', 'pyarrow')
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+print(json.dumps({{'seconds': seconds, 'lazy_loaded': [name for name in {lazy!r} if name in sys.modules]}}))
+"""
+
+# Start the app as it is deployed, wait for its warm-up and print the status of GET /ready
+WARMUP_CHILDREN = {
+    'main_api': """
+import json, time
+started = time.perf_counter()
+import main_api
+main_api.warmup.wait({timeout})
+status = main_api.app.test_client().get('/ready').status_code
+print('RESULT ' + json.dumps({{'seconds': time.perf_counter() - started, 'status': status}}))
+""",
+    'main_asgi': """
+import asyncio, json, time
+started = time.perf_counter()
+import main_asgi
+
+async def ready_status():
+    # Runs the worker lifespan and sends GET /ready straight to the ASGI app
+    async with main_asgi.lifespan(main_asgi.app):
+        await asyncio.get_running_loop().run_in_executor(None, main_asgi.app.state.warmup.wait, {timeout})
+        messages = []
+        async def receive():
+            return {{'type': 'http.request', 'body': b'', 'more_body': False}}
+        async def send(message):
+            messages.append(message)
+        scope = {{'type': 'http', 'asgi': {{'version': '3.0'}}, 'http_version': '1.1', 'method': 'GET',
+                 'scheme': 'http', 'path': '/ready', 'raw_path': b'/ready', 'root_path': '', 'query_string': b'',
+                 'headers': [], 'server': ('localhost', 8000), 'client': ('127.0.0.1', 0)}}
+        await main_asgi.app(scope, receive, send)
+        return messages[0]['status']
+
+status = asyncio.run(ready_status())
+print('RESULT ' + json.dumps({{'seconds': time.perf_counter() - started, 'status': status}}))
+""",
+}
+
+def child_env(**overrides) -> dict:
+    env = dict(os.environ)
+    # No model loading, no reload thread, no log output mixed into the result line
+    env.update({'MODEL_WARMUP': 'off', 'MODEL_RELOAD_INTERVAL': '0', 'LOG_LEVEL': 'WARNING'})
+    env.update(overrides)
+    return env
+
+def import_once(module: str, importtime: bool = False) -> tuple:
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else [])
+    command += ['-c', CHILD.format(module=module, lazy=LAZY_MODULES)]
+    started = time.perf_counter()
+    completed = subprocess.run(command, cwd=APP_DIR, env=child_env(), capture_output=True, text=True)
+    process_seconds = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), process_seconds, completed.stderr
+
+def check_warmup(module: str, timeout: float) -> dict:
+    # INFO logging as in production, so errors raised while logging the warm-up show up here too
+    env = child_env(MODEL_WARMUP='background', LOG_LEVEL='INFO')
+    command = [sys.executable, '-c', WARMUP_CHILDREN[module].format(timeout=timeout)]
+    completed = subprocess.run(command, cwd=APP_DIR, env=env, capture_output=True, text=True, timeout=timeout + 60)
+    results = [line[len('RESULT '):] for line in completed.stdout.splitlines() if line.startswith('RESULT ')]
+    if completed.returncode != 0 or not results:
+        raise RuntimeError(f"Warming up {module} failed:\n{completed.stderr[-2000:]}")
+    result = json.loads(results[-1])
+    return {'module': module, 'ready_status': result['status'], 'ready_seconds': round(result['seconds'], 3)}
+
+def slowest_imports(importtime_output: str, top: int) -> list:
+    # -X importtime lines: "import time: self [us] | cumulative | imported package", with names
+    # indented two spaces per level; the entry point's own imports are one level below it
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.startswith('   ') and not name.startswith('    '):
+            rows.append({'module': name.strip(), 'cumulative_ms': round(int(cumulative) / 1000, 1)})
+    return sorted(rows, key=lambda row: row['cumulative_ms'], reverse=True)[:top]
+
+def measure(module: str, repeat: int, top: int) -> dict:
+    # The first run compiles bytecode and warms the OS file cache; it is not counted
+    import_once(module)
+    runs = [import_once(module) for _ in range(repeat)]
+    result, _, importtime_output = import_once(module, importtime=True)
+    return {
+        'module': module,
+        'import_ms': round(statistics.median(run[0]['seconds'] for run in runs) * 1000, 1),
+        'process_ms': round(statistics.median(run[1] for run in runs) * 1000, 1),
+        'lazy_loaded': result['lazy_loaded'],
+        'slowest_imports': slowest_imports(importtime_output, top)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of the service entry points")
+    parser.add_argument('--modules', nargs='+', default=list(ENTRY_POINTS))
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('IMPORT_BUDGET_MS', 500)),
+                        help="median import time allowed per entry point (default: IMPORT_BUDGET_MS or 500)")
+    parser.add_argument('--repeat', type=int, default=5, help="imports per entry point; the median is checked")
+    parser.add_argument('--top', type=int, default=5, help="slowest top-level imports reported per entry point")
+    parser.add_argument('--warmup-timeout', type=float, default=60,
+                        help="seconds an API may take to answer GET /ready with 200 (default: 60)")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = [measure(module, args.repeat, args.top) for module in args.modules]
+    warmups = [check_warmup(module, args.warmup_timeout) for module in args.modules if module in WARMUP_CHILDREN]
+    failures = []
+    print(f"{'entry point':<14} {'import ms':>10} {'process ms':>11}  lazy modules loaded")
+    for result in results:
+        print(f"{result['module']:<14} {result['import_ms']:>10.1f} {result['process_ms']:>11.1f}  "
+              f"{', '.join(result['lazy_loaded']) or '-'}")
+        if result['import_ms'] > args.budget_ms:
+            failures.append(f"{result['module']} imports in {result['import_ms']} ms, budget {args.budget_ms} ms; "
+                            f"slowest: {', '.join(row['module'] for row in result['slowest_imports'])}")
+        if result['lazy_loaded']:
+            failures.append(f"{result['module']} imports {', '.join(result['lazy_loaded'])} at import time")
+    for warmup in warmups:
+        print(f"{warmup['module']:<14} GET /ready {warmup['ready_status']} after {warmup['ready_seconds']:.2f} s")
+        if warmup['ready_status'] != 200:
+            failures.append(f"{warmup['module']} is not ready {args.warmup_timeout:.0f} s after start")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'budget_ms': args.budget_ms, 'python': sys.version.split()[0], 'results': results,
+                       'warmups': warmups}, f, indent=2)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"All entry points within {args.budget_ms:.0f} ms and ready after warm-up")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep per-call INFO logging out of the timings; set LOG_LEVEL to override
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+# The API stage measures the model, not the result cache, and must not start the reload thread
+os.environ.setdefault('PREDICTION_CACHE_SIZE', '0')
+os.environ.setdefault('MODEL_RELOAD_INTERVAL', '0')
+
+from load.csv_loader import CSVLoader
+from load.db_loader import PostgresLoader
+from model.predictor import Predictor
+from transform.data_transformer import DataTransformer, SOURCE_COLUMNS, SOURCE_DTYPES
+from utils.memory import peak_rss_mb, reset_peak_rss
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data_base', 'database_input.csv')
+MODEL_PATH = 'model/new_churn_model.pickle'
+
+# Dataset sizes by name; 10m needs several GB of memory for the pandas transform
+SIZES = {'1k': 1_000, '100k': 100_000, '10m': 10_000_000}
+# Rows generated and written per step when building a dataset file
+GENERATE_CHUNK_ROWS = 1_000_000
+
+def make_dataset_file(rows: int, data_dir: str, seed: int) -> str:
+    """
+    Write a synthetic Telco-shaped CSV with the columns of the sample export.
+
+    Every column is resampled independently from the sample, so values (including
+    blank TotalCharges) keep their distribution without copying whole customers.
+    Ids are unique. Files are cached per size and seed, so reruns read the same data.
+    """
+    path = os.path.join(data_dir, f"telco_{rows}_seed{seed}.csv")
+    if os.path.exists(path):
+        return path
+    os.makedirs(data_dir, exist_ok=True)
+    sample = pd.read_csv(SAMPLE_PATH, dtype=str, keep_default_na=False)
+    rng = np.random.default_rng(seed)
+    partial = path + '.partial'
+    for start in range(0, rows, GENERATE_CHUNK_ROWS):
+        size = min(GENERATE_CHUNK_ROWS, rows - start)
+        chunk = pd.DataFrame({
+            column: sample[column].to_numpy()[rng.integers(0, len(sample), size=size)]
+            for column in sample.columns
+        })
+        chunk['id'] = np.arange(start, start + size)
+        chunk['customerID'] = 'SYN-' + chunk['id'].astype(str)
+        chunk.to_csv(partial, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    os.replace(partial, path)
+    return path
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_stage(stage: str, rows: int, func: Callable, repeat: int, setup: Optional[Callable] = None) -> dict:
+    """
+    Run one stage repeat times and summarize its timings and peak memory.
+
+    setup() runs before every repetition, outside the timing, and its result is
+    passed to func. The peak RSS is reset before each run, so it covers the stage
+    plus whatever the process already held (the baseline is reported too).
+    """
+    seconds, peaks, baselines, result = [], [], [], None
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        gc.collect()
+        reset_peak_rss()
+        baselines.append(peak_rss_mb())
+        started = time.perf_counter()
+        result = func(argument) if setup is not None else func()
+        seconds.append(time.perf_counter() - started)
+        peaks.append(peak_rss_mb())
+    return summarize(stage, rows, seconds, rows / np.median(seconds), max(peaks), min(baselines)), result
+
+def summarize(stage: str, rows: int, seconds: List[float], rows_per_sec: float, peak: float, baseline: float) -> dict:
+    return {
+        'stage': stage,
+        'rows': rows,
+        'samples': len(seconds),
+        'p50_ms': round(float(np.percentile(seconds, 50)) * 1000, 3),
+        'p99_ms': round(float(np.percentile(seconds, 99)) * 1000, 3),
+        'rows_per_sec': round(float(rows_per_sec), 1),
+        'peak_rss_mb': peak,
+        'baseline_rss_mb': baseline
+    }
+
+def bench_pipeline(path: str, rows: int, repeat: int, predictor: Predictor) -> tuple:
+    transformer = DataTransformer()
+    results = []
+    result, df = run_stage('csv_load', rows, CSVLoader(path).load_data, repeat)
+    results.append(result)
+    result, transformed = run_stage('transform', rows, transformer.transform, repeat, setup=df.copy)
+    results.append(result)
+    result, _ = run_stage('get_features_for_prediction', rows,
+                          transformer.get_features_for_prediction, repeat, setup=transformed.copy)
+    results.append(result)
+    del transformed
+    result, predictions = run_stage('predict', rows, predictor.predict, repeat, setup=lambda: df)
+    results.append(result)
+    return results, df, predictions
+
+def bench_db(df: pd.DataFrame, predictions, rows: int, repeat: int, db: str, sqlite_path: str) -> List[dict]:
+    """
+    Time the DB read and write stages.
+
+    With db='postgres' the real PostgresLoader/DBWriter run against the DATABASE_*
+    settings on scratch tables. With db='sqlite' a local file stands in: the read
+    runs the loader's projected SELECT through pd.read_sql, the write appends
+    with DataFrame.to_sql like DBWriter.write_predictions.
+    """
+    from sqlalchemy import create_engine, text
+    source_table, result_table = 'customer_data_bench', 'prediction_results_bench'
+    output = pd.DataFrame({'id': df['id'].to_numpy(), 'predict_result': np.asarray(predictions)})
+
+    if db == 'postgres':
+        from utils.db import database_params_from_env, dispose_engines
+        from writer.db_writer import DBWriter
+        params = database_params_from_env()
+        loader, writer = PostgresLoader(**params), DBWriter(**params)
+        engine = loader.engine
+        load = lambda: loader.load_columns(SOURCE_COLUMNS, SOURCE_DTYPES, table_name=source_table)
+        write = lambda: writer.write_predictions_copy(output, result_table)
+    else:
+        if os.path.exists(sqlite_path):
+            os.remove(sqlite_path)
+        engine = create_engine(f"sqlite:///{sqlite_path}")
+        query = PostgresLoader.build_select(SOURCE_COLUMNS, source_table)
+        load = lambda: pd.read_sql(query, engine).astype(SOURCE_DTYPES)
+        write = lambda: output.assign(prediction_date=datetime.now().date()).to_sql(
+            result_table, engine, if_exists='append', index=False, chunksize=100_000)
+
+    def reset_results():
+        with engine.connect() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {result_table}"))
+            connection.commit()
+        if db == 'postgres':
+            # DBWriter remembers the tables it created
+            writer._created_tables.discard(result_table)
+
+    df[['id'] + SOURCE_COLUMNS].to_sql(source_table, engine, if_exists='replace', index=False, chunksize=100_000)
+    results = [run_stage(f'db_load_{db}', rows, load, repeat)[0]]
+    results.append(run_stage(f'db_write_{db}', rows, lambda _: write(), repeat, setup=reset_results)[0])
+
+    with engine.connect() as connection:
+        for table in (source_table, result_table):
+            connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        connection.commit()
+    if db == 'postgres':
+        dispose_engines()
+    else:
+        engine.dispose()
+        os.remove(sqlite_path)
+    return results
+
+def bench_endpoint(df: pd.DataFrame, requests: int) -> dict:
+    # Imported here: main_api starts loading the model at import time
+    import main_api
+    if not main_api.warmup.wait():
+        raise RuntimeError(f"API warm-up failed: {main_api.warmup.error}")
+    client = main_api.app.test_client()
+    # API clients send numbers: drop the export's blank TotalCharges and missing values
+    payload = df[SOURCE_COLUMNS].astype({'Contract': str, 'PhoneService': str})
+    payload['TotalCharges'] = pd.to_numeric(payload['TotalCharges'], errors='coerce')
+    records = payload.dropna().to_dict('records')
+    records = [records[i % len(records)] for i in range(requests)]
+    client.post('/predict', json=records[0])
+
+    gc.collect()
+    reset_peak_rss()
+    baseline = peak_rss_mb()
+    latencies = []
+    started = time.perf_counter()
+    for record in records:
+        step = time.perf_counter()
+        response = client.post('/predict', json=record)
+        latencies.append(time.perf_counter() - step)
+        if response.status_code != 200:
+            raise RuntimeError(f"/predict returned {response.status_code}: {response.get_data(as_text=True)}")
+    total = time.perf_counter() - started
+    return summarize('api_predict', requests, latencies, requests / total, peak_rss_mb(), baseline)
+
+def compare(results: List[dict], baseline_path: str, max_regression: Optional[float]) -> bool:
+    """Print p50 changes against an earlier run; return False if any stage slowed down beyond max_regression."""
+    with open(baseline_path) as f:
+        previous = {(r['stage'], r['rows']): r for r in json.load(f)['results']}
+    ok = True
+    print(f"\nCompared with {baseline_path}")
+    print(f"{'stage':>28} {'rows':>10} {'p50 before':>11} {'p50 now':>10} {'change':>8}")
+    for result in results:
+        before = previous.get((result['stage'], result['rows']))
+        if before is None:
+            continue
+        change = result['p50_ms'] / before['p50_ms'] - 1 if before['p50_ms'] else 0.0
+        flag = ''
+        if max_regression is not None and change > max_regression:
+            flag, ok = '  REGRESSION', False
+        print(f"{result['stage']:>28} {result['rows']:>10} {before['p50_ms']:>11.2f} {result['p50_ms']:>10.2f} "
+              f"{change:>+7.1%}{flag}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scoring pipeline on synthetic Telco-shaped data")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['1k', '100k'])
+    parser.add_argument('--repeat', type=int, default=5, help="runs per stage; p50/p99 are over these runs")
+    parser.add_argument('--requests', type=int, default=2000, help="single-record /predict calls")
+    parser.add_argument('--db', choices=['sqlite', 'postgres', 'none'], default='sqlite',
+                        help="sqlite is a local stand-in; postgres uses the DATABASE_* settings")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'churn_bench'))
+    parser.add_argument('--output', default=f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    parser.add_argument('--compare', help="earlier result file to compare p50 latencies with")
+    parser.add_argument('--max-regression', type=float,
+                        help="with --compare, exit with status 1 if a stage's p50 grew by more than this fraction")
+    args = parser.parse_args()
+
+    predictor = Predictor()
+    predictor.load_model(MODEL_PATH)
+
+    results = []
+    print(f"{'stage':>28} {'rows':>10} {'p50 ms':>10} {'p99 ms':>10} {'rows/s':>12} {'peak MB':>8}")
+    def report(new_results):
+        for result in new_results:
+            results.append(result)
+            print(f"{result['stage']:>28} {result['rows']:>10} {result['p50_ms']:>10.2f} {result['p99_ms']:>10.2f} "
+                  f"{result['rows_per_sec']:>12.0f} {result['peak_rss_mb']:>8.1f}")
+
+    smallest = None
+    for name in args.sizes:
+        rows = SIZES[name]
+        path = make_dataset_file(rows, args.data_dir, args.seed)
+        stage_results, df, predictions = bench_pipeline(path, rows, args.repeat, predictor)
+        report(stage_results)
+        if args.db != 'none':
+            report(bench_db(df, predictions, rows, args.repeat, args.db,
+                            os.path.join(args.data_dir, 'bench.sqlite')))
+        if smallest is None or rows < len(smallest):
+            smallest = df
+        del df, predictions
+
+    if args.requests > 0 and smallest is not None:
+        report([bench_endpoint(smallest, args.requests)])
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'packages': {'numpy': np.__version__, 'pandas': pd.__version__,
+                         'scikit-learn': __import__('sklearn').__version__},
+            'settings': {'sizes': args.sizes, 'repeat': args.repeat, 'requests': args.requests,
+                         'db': args.db, 'seed': args.seed, 'engine': predictor.engine},
+            'results': results
+        }, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transform.data_transformer import DataTransformer
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data_base', 'database_input.csv')
+
+def make_dataset(rows: int) -> pd.DataFrame:
+    # Resample the real export so values (including blank TotalCharges) keep their distribution
+    sample = pd.read_csv(SAMPLE_PATH)
+    rng = np.random.default_rng(0)
+    return sample.iloc[rng.integers(0, len(sample), size=rows)].reset_index(drop=True)
+
+def measure(func, *args):
+    # Time and peak memory come from separate runs; tracemalloc slows pandas parsing down a lot
+    started = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare DataTransformer.transform with transform_batch")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    transformer = DataTransformer()
+
+    def pandas_path(df):
+        return transformer.get_features_for_prediction(transformer.transform(df.copy()))
+
+    print(f"{'rows':>10} {'transform (s)':>14} {'peak MB':>8} {'batch (s)':>10} {'peak MB':>8} {'speedup':>8} {'parity':>7}")
+    for rows in args.rows:
+        df = make_dataset(rows)
+        expected, pandas_seconds, pandas_peak = measure(pandas_path, df)
+        actual, batch_seconds, batch_peak = measure(transformer.transform_batch, df)
+        parity = np.array_equal(expected.to_numpy(dtype=np.float32), actual, equal_nan=True)
+        print(f"{rows:>10} {pandas_seconds:>14.3f} {pandas_peak:>8.1f} {batch_seconds:>10.3f} {batch_peak:>8.1f} "
+              f"{pandas_seconds / batch_seconds:>7.1f}x {'OK' if parity else 'FAILED':>7}")
+
+if __name__ == "__main__":
+    main()
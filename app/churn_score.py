@@ -0,0 +1,110 @@
+"""
+churn-score: chunked batch scoring from any source to any sinks.
+
+    python churn_score.py --source data_base/database_input.csv --sink predictions.parquet
+    python churn_score.py --source postgres:customer_data --sink postgres:prediction_results --workers 4
+
+Sources and sinks are "scheme:target" specs (a bare path picks the scheme from
+its extension). Built-in sources: csv, parquet, postgres; sinks: postgres, parquet,
+arrow, csv, null. Modules passed with --plugin can register more with
+pipeline.plugins.register_source/register_sink. PostgreSQL connections use the
+DATABASE_* environment variables.
+"""
+import argparse
+import json
+import os
+import sys
+from pipeline.plugins import SINKS, SOURCES, create_sink, create_source, load_plugins
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# The model ships next to this file, so the default works from any working directory
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model', 'new_churn_model.pickle')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='churn-score', description="Score customers for churn in chunks")
+    parser.add_argument('--source', required=True,
+                        help=f"input spec, e.g. data.csv, data.parquet or postgres:customer_data ({', '.join(sorted(SOURCES))})")
+    parser.add_argument('--sink', action='append', default=[],
+                        help=f"output spec, repeatable; without one only summary stats are reported ({', '.join(sorted(SINKS))})")
+    parser.add_argument('--chunk-size', type=int, default=int(os.environ.get('CHUNK_SIZE') or 100_000),
+                        help="rows per chunk (default: CHUNK_SIZE or 100000)")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SCORING_WORKERS', 1)),
+                        help="scoring processes; 1 scores in this process (default: SCORING_WORKERS or 1)")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="model pickle (default: %(default)s)")
+    parser.add_argument('--id-column', default='id', help="source column written as the prediction id")
+    parser.add_argument('--prefetch', type=int, default=2, help="chunks buffered between load, score and write")
+    parser.add_argument('--csv-engine', default=os.environ.get('CSV_ENGINE') or None,
+                        help="pandas CSV parser for csv sources, e.g. 'python'")
+    parser.add_argument('--db-write-mode', choices=['copy', 'to_sql'], default=os.environ.get('DB_WRITE_MODE', 'copy'),
+                        help="postgres sink: COPY upserts or DataFrame.to_sql appends")
+    parser.add_argument('--plugin', action='append', default=[], help="module registering extra sources or sinks")
+    parser.add_argument('--summary-json', help="also write the run summary to this file")
+    return parser
+
+
+def print_summary(stats: dict):
+    print("\nSummary Statistics:")
+    print("-" * 50)
+    print(f"Total Customers: {stats['rows']}")
+    print(f"Predicted Churns: {stats['churn_count']}")
+    print(f"Churn Rate: {stats['churn_rate']:.2f}%")
+    print(f"Chunks: {stats['chunks']}")
+    print(f"Seconds: {stats['seconds']:.3f} ({stats['rows_per_second'] or 0:.0f} rows/s)")
+    print(f"Stage busy seconds: load {stats['load_seconds']:.3f}, score {stats['score_seconds']:.3f}, "
+          f"write {stats['write_seconds']:.3f}")
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    load_plugins(args.plugin)
+    options = {'csv_engine': args.csv_engine, 'db_write_mode': args.db_write_mode}
+    # The model stack is imported once the arguments are valid, so --help and usage errors return at once
+    from model.predictor import Predictor
+    from model.parallel_scorer import ParallelScorer
+    from pipeline.runner import ChunkPipeline
+
+    try:
+        predictor = Predictor()
+        predictor.load_model(args.model)
+
+        source = create_source(args.source, options)
+        sinks = [create_sink(spec, options) for spec in args.sink]
+        chunks = source(predictor.data_transformer, args.chunk_size, [args.id_column])
+
+        if args.workers > 1:
+            score = ParallelScorer(args.model, workers=args.workers).score_frames
+        else:
+            score = lambda frames: (predictor.predict(frame) for frame in frames)
+
+        logger.info("Starting scoring run", extra={
+            "source": args.source,
+            "sinks": args.sink,
+            "chunk_size": args.chunk_size,
+            "workers": args.workers,
+            "model_version": predictor.model_version
+        })
+        stats = ChunkPipeline(score, sinks, id_column=args.id_column, prefetch=args.prefetch).run(chunks)
+        stats['model_version'] = predictor.model_version
+        logger.info("Scoring run completed", extra=stats)
+        print_summary(stats)
+
+        if args.summary_json:
+            with open(args.summary_json, 'w') as f:
+                json.dump(stats, f, indent=2)
+        return 0
+
+    except Exception as e:
+        logger.error("Scoring run failed", extra={"error": str(e)}, exc_info=True)
+        print(f"An error occurred: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        # utils.db (and SQLAlchemy) is only imported by the PostgreSQL sources and sinks
+        if 'utils.db' in sys.modules:
+            sys.modules['utils.db'].dispose_engines()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Pre-fork serving of main_api with gunicorn: gunicorn -c gunicorn.conf.py main_api:app
+
+The master imports main_api (and with it loads the model through
+Predictor.load_model) before forking, so every worker starts with the model's
+pages shared copy-on-write. Everything allocated up to that point is moved to
+the GC's permanent generation with gc.freeze(), so collections in the workers
+never write to those objects' headers and the pages stay shared. The model is
+therefore loaded while main_api is imported (MODEL_WARMUP=blocking) rather than
+on a background thread, which would not survive the fork.
+"""
+import gc
+import os
+import sys
+import threading
+
+bind = f"{os.environ.get('PREFORK_HOST', '0.0.0.0')}:{os.environ.get('PREFORK_PORT', 8000)}"
+workers = int(os.environ.get('PREFORK_WORKERS', os.cpu_count() or 1))
+# Threads per worker, so concurrent /predict requests can be coalesced
+worker_class = 'gthread'
+threads = int(os.environ.get('PREFORK_THREADS', 4))
+preload_app = True
+# Read by main_api when the master imports it
+os.environ.setdefault('MODEL_WARMUP', 'blocking')
+graceful_timeout = int(os.environ.get('PREFORK_GRACEFUL_TIMEOUT', 30))
+# Seconds between per-worker memory reports from the master; 0 disables them
+MEMORY_REPORT_INTERVAL = float(os.environ.get('MEMORY_REPORT_INTERVAL', 60))
+
+
+def _report_worker_memory(server):
+    from utils.logger import setup_logger
+    from utils.memory import process_memory
+    logger = setup_logger('prefork')
+    while True:
+        memory = {pid: process_memory(pid) for pid in list(server.WORKERS)}
+        logger.info("Worker memory", extra={
+            "workers": {str(pid): usage for pid, usage in memory.items()},
+            "total_rss_mb": round(sum(usage.get('rss_mb', 0) for usage in memory.values()), 1),
+            "total_pss_mb": round(sum(usage.get('pss_mb', 0) for usage in memory.values()), 1)
+        })
+        threading.Event().wait(MEMORY_REPORT_INTERVAL)
+
+
+def when_ready(server):
+    # The app (and the model) is loaded in the master at this point
+    api = sys.modules.get('main_api')
+    if api is not None and api.model_watcher is not None:
+        # Workers watch the artifact themselves; the master never serves requests
+        api.model_watcher.stop()
+    gc.collect()
+    gc.freeze()
+
+    from utils.logger import setup_logger
+    from utils.memory import process_memory
+    setup_logger('prefork').info("Pre-fork master ready", extra={
+        "workers": workers,
+        "threads": threads,
+        "frozen_objects": gc.get_freeze_count(),
+        "master_memory": process_memory()
+    })
+    if MEMORY_REPORT_INTERVAL > 0:
+        threading.Thread(target=_report_worker_memory, args=(server,), name="memory-report", daemon=True).start()
+
+
+def post_fork(server, worker):
+    api = sys.modules.get('main_api')
+    if api is not None and api.model_watcher is not None:
+        api.model_watcher.start()
+
+
+def post_worker_init(worker):
+    from utils.logger import setup_logger
+    from utils.memory import process_memory
+    setup_logger('prefork').info("Worker started", extra={
+        "pid": worker.pid,
+        "memory": process_memory()
+    })
+
+
+def worker_exit(server, worker):
+    from utils.logger import shutdown_logging
+    shutdown_logging()
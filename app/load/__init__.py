@@ -1,6 +1,7 @@
 from .base_loader import BaseLoader
 from .csv_loader import CSVLoader
+from .parquet_loader import ParquetLoader
 #from .db_loader import PostgresLoader
 
 #__all__ = ['BaseLoader', 'CSVLoader', 'PostgresLoader'] 
-__all__ = ['BaseLoader', 'CSVLoader'] 
\ No newline at end of file
+__all__ = ['BaseLoader', 'CSVLoader', 'ParquetLoader']
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional
 import pandas as pd
 
 class BaseLoader(ABC):
@@ -15,4 +16,60 @@ class BaseLoader(ABC):
         Returns:
             pd.DataFrame: The loaded data
         """
-        pass 
\ No newline at end of file
+        pass
+
+    def load_columns(self, columns: List[str], dtypes: Optional[dict] = None) -> pd.DataFrame:
+        """
+        Load only the given columns, converted to the given dtypes.
+        
+        This default implementation loads everything and projects afterwards;
+        loaders that can push the projection into the source override it.
+        
+        Args:
+            columns (List[str]): Columns to load
+            dtypes (Optional[dict]): dtype per column for the columns that should be converted
+            
+        Returns:
+            pd.DataFrame: The loaded columns
+        """
+        df = self.load_data()[columns]
+        dtypes = {column: dtype for column, dtype in (dtypes or {}).items() if column in columns}
+        return df.astype(dtypes) if dtypes else df
+
+    def load_features(self, transformer, key_columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load only the source columns a DataTransformer needs, plus optional key columns.
+        
+        Args:
+            transformer (DataTransformer): Transformer whose source_columns and source_dtypes are used
+            key_columns (Optional[List[str]]): Extra columns to keep, e.g. ['id']
+            
+        Returns:
+            pd.DataFrame: The projected, typed data
+        """
+        return self.load_columns(_feature_columns(transformer, key_columns), transformer.source_dtypes)
+
+    def load_feature_chunks(self, transformer, chunk_size: int,
+                            key_columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream the columns load_features() returns as DataFrames of at most chunk_size rows.
+        
+        This default implementation loads everything and slices it; loaders that
+        can read incrementally override it so only a chunk is held at a time.
+        
+        Args:
+            transformer (DataTransformer): Transformer whose source_columns and source_dtypes are used
+            chunk_size (int): Maximum number of rows per chunk
+            key_columns (Optional[List[str]]): Extra columns to keep, e.g. ['id']
+            
+        Yields:
+            pd.DataFrame: The next chunk
+        """
+        df = self.load_features(transformer, key_columns)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+
+def _feature_columns(transformer, key_columns: Optional[List[str]] = None) -> List[str]:
+    """Key columns followed by the transformer's source columns, without duplicates."""
+    return list(key_columns or []) + [c for c in transformer.source_columns if c not in (key_columns or [])]
@@ -1,20 +1,23 @@
 import pandas as pd
 from pathlib import Path
-from .base_loader import BaseLoader
+from typing import Iterator, List, Optional
+from .base_loader import BaseLoader, _feature_columns
 
 class CSVLoader(BaseLoader):
     """
     Loader class for reading data from CSV files.
     """
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, engine: Optional[str] = None):
         """
         Initialize the CSV loader with the path to the CSV file.
         
         Args:
             file_path (str): Path to the CSV file
+            engine (Optional[str]): pandas CSV parser engine, e.g. 'pyarrow' (default: pandas' C engine)
         """
         self.file_path = Path(file_path)
+        self.engine = engine
         
     def load_data(self) -> pd.DataFrame:
         """
@@ -30,4 +33,67 @@ class CSVLoader(BaseLoader):
         if not self.file_path.exists():
             raise FileNotFoundError(f"CSV file not found at {self.file_path}")
             
-        return pd.read_csv(self.file_path) 
\ No newline at end of file
+        return pd.read_csv(self.file_path) 
+
+    def load_columns(self, columns: List[str], dtypes: Optional[dict] = None) -> pd.DataFrame:
+        """
+        Load only the given columns from the CSV file.
+        
+        The projection and dtypes are pushed into read_csv, so other columns are
+        never materialized. Blank strings are read as missing values.
+        
+        Args:
+            columns (List[str]): Columns to load
+            dtypes (Optional[dict]): dtype per column for the columns that should be converted
+            
+        Returns:
+            pd.DataFrame: The loaded columns, in the requested order
+            
+        Raises:
+            FileNotFoundError: If the CSV file doesn't exist
+        """
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"CSV file not found at {self.file_path}")
+        
+        options = {'engine': self.engine} if self.engine else {}
+        df = pd.read_csv(
+            self.file_path,
+            usecols=columns,
+            dtype={column: dtype for column, dtype in (dtypes or {}).items() if column in columns},
+            na_values=[' '],
+            **options
+        )
+        return df[columns]
+
+    def load_feature_chunks(self, transformer, chunk_size: int,
+                            key_columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream the feature columns with read_csv(chunksize=...), so only one chunk is parsed at a time.
+        
+        Args:
+            transformer (DataTransformer): Transformer whose source_columns and source_dtypes are used
+            chunk_size (int): Maximum number of rows per chunk
+            key_columns (Optional[List[str]]): Extra columns to keep, e.g. ['id']
+            
+        Yields:
+            pd.DataFrame: The next chunk, columns in load_features() order
+            
+        Raises:
+            FileNotFoundError: If the CSV file doesn't exist
+        """
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"CSV file not found at {self.file_path}")
+        
+        columns = _feature_columns(transformer, key_columns)
+        # The pyarrow parser does not support chunksize
+        options = {'engine': self.engine} if self.engine and self.engine != 'pyarrow' else {}
+        with pd.read_csv(
+            self.file_path,
+            usecols=columns,
+            dtype={column: dtype for column, dtype in transformer.source_dtypes.items() if column in columns},
+            na_values=[' '],
+            chunksize=chunk_size,
+            **options
+        ) as reader:
+            for chunk in reader:
+                yield chunk[columns]
@@ -1,7 +1,20 @@
+import os
+import queue
+import threading
+import uuid
 import pandas as pd
-from sqlalchemy import create_engine
-from .base_loader import BaseLoader
+from typing import Iterator, List, Optional
+from .base_loader import BaseLoader, _feature_columns
 from utils.logger import setup_logger
+from utils.db import get_engine
+
+# Rows fetched per round trip by load_data_prefetched, and blocks buffered ahead of the consumer
+# (main_db.py streams without prefetching when DB_PREFETCH_DEPTH is 0)
+DB_FETCH_SIZE = int(os.environ.get('DB_FETCH_SIZE', 10000))
+DB_PREFETCH_DEPTH = int(os.environ.get('DB_PREFETCH_DEPTH', 2))
+
+# Marks the end of the prefetched stream
+_END = object()
 
 class PostgresLoader(BaseLoader):
     """
@@ -20,8 +33,8 @@ class PostgresLoader(BaseLoader):
             password (str): Database password
         """
         self.logger = setup_logger(__name__)
-        self.connection_string = f"postgresql://{user}:{password}@{host}:{port}/{database}"
-        self.engine = create_engine(self.connection_string)
+        # Engines are shared per database, so loaders and writers reuse one connection pool
+        self.engine = get_engine(host, port, database, user, password)
         self.logger.info("PostgreSQL loader initialized", extra={
             "host": host,
             "port": port,
@@ -29,12 +42,13 @@ class PostgresLoader(BaseLoader):
             "user": user
         })
         
-    def load_data(self, query: str) -> pd.DataFrame:
+    def load_data(self, query: str, params: Optional[dict] = None) -> pd.DataFrame:
         """
         Load data from PostgreSQL database using the provided query.
         
         Args:
             query (str): SQL query to execute
+            params (Optional[dict]): Values for %(name)s placeholders in the query
             
         Returns:
             pd.DataFrame: The loaded data from the database
@@ -44,7 +58,7 @@ class PostgresLoader(BaseLoader):
         """
         try:
             self.logger.info("Executing database query", extra={"query": query})
-            df = pd.read_sql(query, self.engine)
+            df = pd.read_sql(query, self.engine, params=params)
             self.logger.info("Data loaded successfully", extra={
                 "rows": len(df),
                 "columns": list(df.columns)
@@ -55,4 +69,224 @@ class PostgresLoader(BaseLoader):
                 "error": str(e),
                 "query": query
             }, exc_info=True)
-            raise Exception(f"Error loading data from PostgreSQL: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Error loading data from PostgreSQL: {str(e)}") 
+
+    @staticmethod
+    def build_select(columns: List[str], table_name: str = 'customer_data', where: Optional[str] = None) -> str:
+        """
+        Build a select statement that fetches only the given columns.
+        
+        Column names are double-quoted, so mixed-case names such as
+        "TotalCharges" are matched exactly.
+        
+        Args:
+            columns (List[str]): Columns to select
+            table_name (str): Table to read from
+            where (Optional[str]): Optional filter, including any order by clause
+            
+        Returns:
+            str: The SQL query
+        """
+        projection = ", ".join('"{}"'.format(column.replace('"', '""')) for column in columns)
+        query = f"select {projection} from {table_name}"
+        return f"{query} where {where}" if where else query
+
+    @staticmethod
+    def build_delta_select(columns: List[str], hash_columns: List[str], table_name: str = 'customer_data',
+                           state_table: str = 'scoring_state') -> str:
+        """
+        Build a select statement that fetches only rows not scored yet in their current form.
+        
+        A row hash (md5 over hash_columns) is computed in the database and compared
+        with the hash stored in state_table when the row was last scored. Rows are
+        returned when they are new, when the hashed columns changed, or when they
+        were scored by another model version. The query takes a %(model_version)s
+        parameter and returns the selected columns plus row_hash.
+        
+        Args:
+            columns (List[str]): Columns to select; must include 'id'
+            hash_columns (List[str]): Columns whose changes require re-scoring
+            table_name (str): Table to read from
+            state_table (str): Table with the id, row_hash and model_version of scored rows
+            
+        Returns:
+            str: The SQL query
+        """
+        quote = lambda column: '"{}"'.format(column.replace('"', '""'))
+        projection = ", ".join(f"c.{quote(column)}" for column in columns)
+        row_hash = "md5(row({})::text)".format(", ".join(f"c.{quote(column)}" for column in hash_columns))
+        return (
+            f"select {projection}, {row_hash} as row_hash "
+            f"from {table_name} c left join {state_table} s on s.id = c.id "
+            f"where s.id is null or s.row_hash <> {row_hash} "
+            f"or s.model_version is distinct from %(model_version)s"
+        )
+
+    def load_columns(self, columns: List[str], dtypes: Optional[dict] = None,
+                     table_name: str = 'customer_data') -> pd.DataFrame:
+        """
+        Load only the given columns of a table.
+        
+        The projection is pushed into the SQL, so the other columns never leave
+        the database; dtypes are applied to the result.
+        
+        Args:
+            columns (List[str]): Columns to load
+            dtypes (Optional[dict]): dtype per column for the columns that should be converted
+            table_name (str): Table to read from
+            
+        Returns:
+            pd.DataFrame: The loaded columns
+        """
+        df = self.load_data(self.build_select(columns, table_name))
+        dtypes = {column: dtype for column, dtype in (dtypes or {}).items() if column in columns}
+        return df.astype(dtypes) if dtypes else df
+
+    def load_feature_chunks(self, transformer, chunk_size: int, key_columns: Optional[List[str]] = None,
+                            table_name: str = 'customer_data') -> Iterator[pd.DataFrame]:
+        """
+        Stream the feature columns of a table from a server-side cursor.
+        
+        Args:
+            transformer (DataTransformer): Transformer whose source_columns and source_dtypes are used
+            chunk_size (int): Maximum number of rows per chunk
+            key_columns (Optional[List[str]]): Extra columns to keep, e.g. ['id']
+            table_name (str): Table to read from
+            
+        Yields:
+            pd.DataFrame: The next chunk, converted to the transformer's dtypes
+        """
+        columns = _feature_columns(transformer, key_columns)
+        dtypes = {column: dtype for column, dtype in transformer.source_dtypes.items() if column in columns}
+        for chunk in self.load_data_prefetched(self.build_select(columns, table_name), fetch_size=chunk_size):
+            yield chunk.astype(dtypes) if dtypes else chunk
+
+    def load_data_prefetched(self, query: str, fetch_size: Optional[int] = None, prefetch_depth: Optional[int] = None,
+                             params: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream the result of a query while the next blocks are fetched in the background.
+        
+        The query runs on a named (server-side) cursor. A background thread fetches
+        fetch_size rows per round trip, builds the DataFrame and puts it on a queue
+        holding at most prefetch_depth blocks, so the network and the server keep
+        working while the consumer transforms and predicts the current block. When
+        the queue is full the thread waits, so at most prefetch_depth + 2 blocks
+        are in memory. Closing the iterator early stops the fetch and releases the
+        connection.
+        
+        Args:
+            query (str): SQL query to execute
+            fetch_size (Optional[int]): Rows per block (default: DB_FETCH_SIZE)
+            prefetch_depth (Optional[int]): Blocks fetched ahead of the consumer (default: DB_PREFETCH_DEPTH)
+            params (Optional[dict]): Values for %(name)s placeholders in the query
+            
+        Yields:
+            pd.DataFrame: The next block of the result
+            
+        Raises:
+            Exception: If there's an error connecting to the database or executing the query
+        """
+        fetch_size = fetch_size or DB_FETCH_SIZE
+        prefetch_depth = max(1, prefetch_depth or DB_PREFETCH_DEPTH)
+        blocks = queue.Queue(maxsize=prefetch_depth)
+        stop = threading.Event()
+        self.logger.info("Executing prefetched database query", extra={
+            "query": query,
+            "fetch_size": fetch_size,
+            "prefetch_depth": prefetch_depth
+        })
+        fetcher = threading.Thread(
+            target=self._fetch_blocks, args=(query, params, fetch_size, blocks, stop),
+            name="postgres-prefetch", daemon=True
+        )
+        fetcher.start()
+        try:
+            while True:
+                block = blocks.get()
+                if block is _END:
+                    return
+                if isinstance(block, Exception):
+                    self.logger.error("Error streaming data from PostgreSQL", extra={
+                        "error": str(block),
+                        "query": query
+                    })
+                    raise Exception(f"Error loading data from PostgreSQL: {str(block)}") from block
+                yield block
+        finally:
+            # Unblock the fetcher if the consumer stopped early, then wait for it to release the connection
+            stop.set()
+            while fetcher.is_alive():
+                try:
+                    blocks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            fetcher.join()
+
+    def _fetch_blocks(self, query: str, params: Optional[dict], fetch_size: int, blocks: queue.Queue,
+                      stop: threading.Event):
+        def put(item):
+            while not stop.is_set():
+                try:
+                    blocks.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        try:
+            connection = self.engine.raw_connection()
+            try:
+                # A named cursor keeps the result on the server and fetches it block by block
+                cursor = connection.cursor(name=f"prefetch_{uuid.uuid4().hex}")
+                cursor.itersize = fetch_size
+                try:
+                    cursor.execute(query, params)
+                    columns = None
+                    while not stop.is_set():
+                        rows = cursor.fetchmany(fetch_size)
+                        if columns is None:
+                            columns = [column[0] for column in cursor.description]
+                        if not rows:
+                            break
+                        put(pd.DataFrame.from_records(rows, columns=columns, coerce_float=True))
+                finally:
+                    cursor.close()
+            finally:
+                connection.rollback()
+                connection.close()
+            put(_END)
+        except Exception as e:
+            put(e)
+
+    def load_data_in_chunks(self, query: str, chunk_size: int, params: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream the result of a query as DataFrames of at most chunk_size rows.
+        
+        The query runs on a server-side cursor, so only one chunk is held in
+        memory at a time regardless of the table size.
+        
+        Args:
+            query (str): SQL query to execute
+            chunk_size (int): Maximum number of rows per chunk
+            params (Optional[dict]): Values for %(name)s placeholders in the query
+            
+        Yields:
+            pd.DataFrame: The next chunk of the result
+            
+        Raises:
+            Exception: If there's an error connecting to the database or executing the query
+        """
+        try:
+            self.logger.info("Executing streaming database query", extra={
+                "query": query,
+                "chunk_size": chunk_size
+            })
+            with self.engine.connect() as connection:
+                connection = connection.execution_options(stream_results=True, max_row_buffer=chunk_size)
+                for chunk in pd.read_sql(query, connection, chunksize=chunk_size, params=params):
+                    yield chunk
+        except Exception as e:
+            self.logger.error("Error streaming data from PostgreSQL", extra={
+                "error": str(e),
+                "query": query
+            }, exc_info=True)
+            raise Exception(f"Error loading data from PostgreSQL: {str(e)}")
@@ -0,0 +1,115 @@
+import pandas as pd
+from pathlib import Path
+from typing import Iterator, List, Optional
+from .base_loader import BaseLoader, _feature_columns
+
+class ParquetLoader(BaseLoader):
+    """
+    Loader class for reading data from Parquet files.
+
+    Files are read through pyarrow with memory mapping, column projection is
+    pushed into the Parquet reader, and large files can be streamed one row
+    group at a time.
+    """
+
+    def __init__(self, file_path: str, memory_map: bool = True):
+        """
+        Initialize the Parquet loader with the path to the Parquet file.
+
+        Args:
+            file_path (str): Path to the Parquet file
+            memory_map (bool): Memory-map the file instead of reading it into a buffer (default: True)
+        """
+        self.file_path = Path(file_path)
+        self.memory_map = memory_map
+
+    def _parquet_file(self):
+        # pyarrow is only needed when Parquet input is used
+        import pyarrow.parquet as pq
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"Parquet file not found at {self.file_path}")
+        return pq.ParquetFile(self.file_path, memory_map=self.memory_map)
+
+    def load_data(self) -> pd.DataFrame:
+        """
+        Load data from the Parquet file.
+
+        Returns:
+            pd.DataFrame: The loaded data from the Parquet file
+
+        Raises:
+            FileNotFoundError: If the Parquet file doesn't exist
+        """
+        return self._parquet_file().read().to_pandas()
+
+    def load_columns(self, columns: List[str], dtypes: Optional[dict] = None) -> pd.DataFrame:
+        """
+        Load only the given columns from the Parquet file.
+
+        Only the column chunks of the requested columns are read from disk.
+
+        Args:
+            columns (List[str]): Columns to load
+            dtypes (Optional[dict]): dtype per column for the columns that should be converted
+
+        Returns:
+            pd.DataFrame: The loaded columns, in the requested order
+
+        Raises:
+            FileNotFoundError: If the Parquet file doesn't exist
+        """
+        df = self._parquet_file().read(columns=columns).to_pandas()
+        return _apply_dtypes(df, columns, dtypes)
+
+    def load_data_in_chunks(self, columns: Optional[List[str]] = None,
+                            dtypes: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream the file as one DataFrame per row group.
+
+        Peak memory is bounded by the largest row group instead of the file size.
+
+        Args:
+            columns (Optional[List[str]]): Columns to load (default: all columns)
+            dtypes (Optional[dict]): dtype per column for the columns that should be converted
+
+        Yields:
+            pd.DataFrame: The next row group
+
+        Raises:
+            FileNotFoundError: If the Parquet file doesn't exist
+        """
+        parquet_file = self._parquet_file()
+        for row_group in range(parquet_file.num_row_groups):
+            df = parquet_file.read_row_group(row_group, columns=columns).to_pandas()
+            yield _apply_dtypes(df, columns or list(df.columns), dtypes)
+
+    def load_feature_chunks(self, transformer, chunk_size: int,
+                            key_columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream the feature columns one row group at a time, split into chunks of at most chunk_size rows.
+
+        Args:
+            transformer (DataTransformer): Transformer whose source_columns and source_dtypes are used
+            chunk_size (int): Maximum number of rows per chunk
+            key_columns (Optional[List[str]]): Extra columns to keep, e.g. ['id']
+
+        Yields:
+            pd.DataFrame: The next chunk
+
+        Raises:
+            FileNotFoundError: If the Parquet file doesn't exist
+        """
+        columns = _feature_columns(transformer, key_columns)
+        for df in self.load_data_in_chunks(columns, transformer.source_dtypes):
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+
+    @property
+    def num_row_groups(self) -> int:
+        """Number of row groups in the file."""
+        return self._parquet_file().num_row_groups
+
+
+def _apply_dtypes(df: pd.DataFrame, columns: List[str], dtypes: Optional[dict]) -> pd.DataFrame:
+    dtypes = {column: dtype for column, dtype in (dtypes or {}).items() if column in columns}
+    return df.astype(dtypes) if dtypes else df
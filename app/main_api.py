@@ -1,63 +1,282 @@
-from flask import Flask, request, jsonify
-import pandas as pd
-from model.predictor import Predictor
-from transform.data_transformer import DataTransformer
-from api.models import CustomerData
-from utils.logger import setup_logger
+from flask import Flask, Response, g, request, jsonify
+import os
+import time
+from model.registry import ModelWatcher
+from model.warmup import ModelWarmup
+from api.models import (
+    CustomerData, NDJSON_MIMETYPES, batch_payload_records, batch_results, parse_ndjson, records_to_frame
+)
+from api.metrics import record_request
+from utils.logger import setup_logger, sample_request, SUMMARY_EVENT
+from utils.memory import process_memory
+from utils.metrics import CONTENT_TYPE, render_metrics
+from utils.profiling import profile_stage, sample_profile
 
 # Initialize logger
 logger = setup_logger(__name__)
 
 app = Flask(__name__)
 
-# Initialize the predictor and transformer
-predictor = Predictor()
+# Cache predictions of repeated feature vectors (PREDICTION_CACHE_SIZE=0 disables it)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 100000))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 0))
+
+# Swap in a new model when the artifact changes (MODEL_RELOAD_INTERVAL=0 disables it)
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', 10))
+
+# Upper bound on the number of customers accepted by /predict/batch
+BATCH_MAX_ROWS = int(os.environ.get('BATCH_MAX_ROWS', 10000))
+
+# 'background' loads the model after import while /ready reports 503, 'blocking' loads it
+# during import (gunicorn pre-fork), 'off' never loads it (import-time checks)
+MODEL_WARMUP = os.environ.get('MODEL_WARMUP', 'background')
+
 model_path = 'model/new_churn_model.pickle'
-predictor.load_model(model_path)
-logger.info("Model loaded successfully", extra={"model_path": model_path})
+# Set by _warm_up(); endpoints that use them only run once warmup.ready is True
+prediction_cache = None
+predictor = None
+coalescer = None
+model_watcher = None
+
+def _warm_up():
+    """Import the model stack, load the model, score the warm-up records and start the model watcher."""
+    global prediction_cache, predictor, coalescer, model_watcher
+    # pandas and scikit-learn are first imported here, off the import path of the app
+    from model.predictor import Predictor
+    from model.coalescer import PredictionCoalescer
+    from model.result_cache import PredictionCache
+
+    cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL) if PREDICTION_CACHE_SIZE > 0 else None
+    loaded = Predictor(cache=cache)
+    loaded.load_model(model_path)
+    logger.info("Model loaded successfully", extra={
+        "model_path": model_path,
+        "model_version": loaded.model_version
+    })
+    loaded.warm_up()
+
+    # Coalesce concurrent /predict requests into micro-batches (PREDICT_MAX_BATCH_SIZE=1 disables it)
+    coalescer = PredictionCoalescer(
+        loaded,
+        max_batch_size=int(os.environ.get('PREDICT_MAX_BATCH_SIZE', 256)),
+        max_wait_us=int(os.environ.get('PREDICT_MAX_WAIT_US', 2000))
+    )
+    prediction_cache, predictor = cache, loaded
+    if MODEL_RELOAD_INTERVAL > 0:
+        model_watcher = ModelWatcher(model_path, predictor.set_model, interval=MODEL_RELOAD_INTERVAL)
+        model_watcher.start()
+
+warmup = ModelWarmup(_warm_up)
+if MODEL_WARMUP != 'off':
+    warmup.start(background=MODEL_WARMUP != 'blocking')
+
+# Endpoints answering 503 until the warm-up has finished
+MODEL_ENDPOINTS = {'predict', 'predict_batch', 'model_info', 'cache_stats'}
+
+def _elapsed_ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 3)
+
+def _log_request_summary(summary: dict, started: float):
+    """Emit the single per-request summary event, which is kept regardless of sampling."""
+    summary["total_ms"] = _elapsed_ms(started)
+    record_request(summary)
+    logger.info("Request completed", extra={"event": SUMMARY_EVENT, **summary})
+
+def _start_request(endpoint: str) -> dict:
+    """Make the per-request sampling decisions and return the request's summary."""
+    sample_request()
+    g.profile_id = sample_profile(request.headers.get('X-Profile'))
+    summary = {"endpoint": endpoint, "status": 500, "validation": None}
+    if g.profile_id:
+        summary["profile_id"] = g.profile_id
+    return summary
+
+@app.before_request
+def require_model():
+    if request.endpoint in MODEL_ENDPOINTS and not warmup.ready:
+        record_request({"endpoint": request.path, "status": 503, "reason": "not_ready"})
+        response = jsonify({'error': "Model is not loaded yet, retry later", **warmup.status()})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
+@app.after_request
+def add_profile_header(response):
+    # Tells the client where the profile reports of its request were written
+    if g.get('profile_id'):
+        response.headers['X-Profile-Id'] = g.profile_id
+    return response
 
 @app.route('/predict', methods=['POST'])
 def predict():
+    started = time.perf_counter()
+    summary = _start_request("/predict")
     try:
         # Get data from request
-        data = request.get_json()
-        logger.info("Received prediction request", extra={"request_data": data})
-        
-        # Create CustomerData instance
-        customer = CustomerData(
-            TotalCharges=float(data.get('TotalCharges', 0)),
-            Contract=data.get('Contract', ''),
-            PhoneService=data.get('PhoneService', ''),
-            tenure=float(data.get('tenure', 0))
-        )
+        with profile_stage('parse', log=False):
+            data = request.get_json()
+            logger.info("Received prediction request", extra={"request_data": data})
+            
+            # Create CustomerData instance
+            customer = CustomerData.from_json(data)
+        summary["parse_ms"] = _elapsed_ms(started)
         
         # Validate data
-        is_valid, error_message = customer.validate()
+        step = time.perf_counter()
+        with profile_stage('validate', log=False):
+            is_valid, error_message = customer.validate()
+        summary["validate_ms"] = _elapsed_ms(step)
+        summary["validation"] = "ok" if is_valid else error_message
         if not is_valid:
-            logger.warning("Invalid data received", extra={"error": error_message})
+            logger.info("Invalid data received", extra={"error": error_message})
+            summary["status"] = 400
             return jsonify({'error': error_message}), 400
         
-        # Convert to DataFrame
-        df = pd.DataFrame([{
-            'TotalCharges': customer.TotalCharges,
-            'Contract': customer.Contract,
-            'PhoneService': customer.PhoneService,
-            'tenure': customer.tenure
-        }])
-        
-        # Make prediction using the predictor (which uses DataTransformer internally)
-        prediction = predictor.predict(df)
-        logger.info("Prediction made successfully", extra={"prediction": int(prediction[0])})
+        # Make prediction through the coalescer, which batches concurrent requests;
+        # a profiled request predicts in this thread so the profile covers the model
+        step = time.perf_counter()
+        if g.profile_id:
+            with profile_stage('predict', log=False):
+                predictions, model_version = predictor.predict_record(customer, return_version=True)
+            prediction = int(predictions[0])
+        else:
+            prediction, model_version = coalescer.predict(customer)
+        summary["predict_ms"] = _elapsed_ms(step)
+        summary["prediction"] = prediction
+        # The version of the model that scored this request, even if another one was swapped in since
+        summary["model_version"] = model_version
+        logger.info("Prediction made successfully", extra={"prediction": prediction})
         
         # Return result
-        return jsonify({
-            'prediction': int(prediction[0]),
-            'churn_status': 'Churn' if prediction[0] == 1 else 'No Churn'
-        })
+        step = time.perf_counter()
+        with profile_stage('serialize', log=False):
+            response = jsonify({
+                'prediction': prediction,
+                'churn_status': 'Churn' if prediction == 1 else 'No Churn',
+                'model_version': summary["model_version"]
+            })
+        summary["serialize_ms"] = _elapsed_ms(step)
+        summary["status"] = 200
+        return response
         
     except Exception as e:
         logger.error("Error during prediction", extra={"error": str(e)}, exc_info=True)
+        summary["error"] = str(e)
+        return jsonify({'error': str(e)}), 500
+    finally:
+        _log_request_summary(summary, started)
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    # Readiness probe: 200 once the model is loaded and warmed up, 503 before or if loading failed
+    return jsonify(warmup.status()), 200 if warmup.ready else 503
+
+@app.route('/model', methods=['GET'])
+def model_info():
+    active = predictor.active_model
+    return jsonify({
+        'model_path': active.path,
+        'model_version': active.version,
+        'model_type': type(active.model).__name__,
+        'load_seconds': round(active.load_seconds, 4),
+        'loaded_at': active.loaded_at
+    })
+
+@app.route('/memory', methods=['GET'])
+def memory_info():
+    # Memory of the worker process that served this request
+    return jsonify({'pid': os.getpid(), **process_memory()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus scrape endpoint; values are per worker process
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+@app.route('/cache', methods=['GET'])
+def cache_stats():
+    if prediction_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **prediction_cache.stats()})
+
+def _read_batch_records():
+    """
+    Parse the /predict/batch body into a list of records.
+
+    Accepts a JSON array, a JSON object with a "customers" array, or NDJSON
+    (one JSON object per line).
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        return parse_ndjson(request.get_data(as_text=True))
+    # Parse any content type like the ASGI service; a bad body is a 400, not werkzeug's error as a 500
+    data = request.get_json(force=True, silent=True)
+    if data is None:
+        raise ValueError("Request body must be valid JSON")
+    return batch_payload_records(data)
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    started = time.perf_counter()
+    summary = _start_request("/predict/batch")
+    try:
+        try:
+            with profile_stage('parse', log=False):
+                records = _read_batch_records()
+        except ValueError as e:
+            logger.warning("Invalid batch request", extra={"error": str(e)})
+            summary["status"] = 400
+            summary["validation"] = str(e)
+            return jsonify({'error': str(e)}), 400
+        summary["parse_ms"] = _elapsed_ms(started)
+        summary["rows"] = len(records)
+
+        if len(records) > BATCH_MAX_ROWS:
+            logger.warning("Batch too large", extra={"rows": len(records), "max_rows": BATCH_MAX_ROWS})
+            summary["status"] = 413
+            return jsonify({'error': f"Batch exceeds the maximum of {BATCH_MAX_ROWS} customers"}), 413
+
+        logger.info("Received batch prediction request", extra={"rows": len(records)})
+
+        # Validate all rows at once, then score the valid ones with a single predict call
+        step = time.perf_counter()
+        with profile_stage('validate', log=False, rows=len(records)):
+            df, errors = records_to_frame(records)
+            valid = errors.isna()
+        summary["validate_ms"] = _elapsed_ms(step)
+        summary["validation"] = {"valid": int(valid.sum()), "invalid": int((~valid).sum())}
+
+        step = time.perf_counter()
+        if valid.any():
+            predictions, model_version = predictor.predict(df[valid].reset_index(drop=True), return_version=True)
+        else:
+            predictions, model_version = [], predictor.model_version
+        summary["predict_ms"] = _elapsed_ms(step)
+        summary["churn_count"] = int(sum(predictions))
+        summary["model_version"] = model_version
+
+        logger.info("Batch prediction completed", extra={
+            "rows": len(records),
+            "scored": int(valid.sum()),
+            "failed": int((~valid).sum())
+        })
+
+        step = time.perf_counter()
+        with profile_stage('serialize', log=False, rows=len(records)):
+            response = jsonify({
+                'total': len(records),
+                'scored': int(valid.sum()),
+                'failed': int((~valid).sum()),
+                'model_version': summary["model_version"],
+                'results': batch_results(valid, errors, predictions)
+            })
+        summary["serialize_ms"] = _elapsed_ms(step)
+        summary["status"] = 200
+        return response
+
+    except Exception as e:
+        logger.error("Error during batch prediction", extra={"error": str(e)}, exc_info=True)
+        summary["error"] = str(e)
         return jsonify({'error': str(e)}), 500
+    finally:
+        _log_request_summary(summary, started)
 
 if __name__ == '__main__':
     logger.info("Starting Flask application", extra={"port": 8000})
@@ -0,0 +1,395 @@
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Tuple
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from model.registry import ModelWatcher
+from model.warmup import ModelWarmup
+from api.models import (
+    CustomerData, NDJSON_MIMETYPES, batch_payload_records, batch_results, parse_ndjson, records_to_frame
+)
+from api.metrics import record_request
+from utils.logger import setup_logger, sample_request, shutdown_logging, SUMMARY_EVENT
+from utils.metrics import CONTENT_TYPE, render_metrics
+from utils.profiling import profile_stage, sample_profile
+
+# Initialize logger
+logger = setup_logger(__name__)
+
+model_path = 'model/new_churn_model.pickle'
+
+# Server settings: worker processes, and seconds in-flight requests get to finish on shutdown
+ASGI_HOST = os.environ.get('ASGI_HOST', '0.0.0.0')
+ASGI_PORT = int(os.environ.get('ASGI_PORT', 8000))
+ASGI_WORKERS = int(os.environ.get('ASGI_WORKERS', 1))
+ASGI_GRACEFUL_TIMEOUT = float(os.environ.get('ASGI_GRACEFUL_TIMEOUT', 30))
+
+# Threads running batch inference, and the number of inference calls allowed in flight
+INFERENCE_THREADS = int(os.environ.get('INFERENCE_THREADS', 4))
+INFERENCE_MAX_PENDING = int(os.environ.get('INFERENCE_MAX_PENDING', 64))
+# Seconds a request waits for an inference slot before getting 503
+INFERENCE_QUEUE_TIMEOUT = float(os.environ.get('INFERENCE_QUEUE_TIMEOUT', 5))
+
+# Same settings as the Flask app
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 100000))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 0))
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', 10))
+BATCH_MAX_ROWS = int(os.environ.get('BATCH_MAX_ROWS', 10000))
+# 'background' starts serving while the model loads, 'blocking' loads it before the worker accepts connections
+MODEL_WARMUP = os.environ.get('MODEL_WARMUP', 'background')
+
+# Paths answering 503 until the worker's warm-up has finished
+MODEL_PATHS = {'/predict', '/predict/batch', '/model', '/cache'}
+
+
+class InferenceOverloaded(Exception):
+    """Raised when no inference slot frees up within INFERENCE_QUEUE_TIMEOUT."""
+
+
+class InferenceService:
+    """
+    Model state of one ASGI worker process.
+
+    Single-record predictions go through the PredictionCoalescer, whose thread
+    batches concurrent requests; batch predictions run on a bounded thread
+    pool. The event loop only awaits futures, and a semaphore caps the number
+    of inference calls in flight so overload turns into 503s instead of an
+    unbounded queue.
+    """
+
+    def __init__(self):
+        # pandas and scikit-learn are first imported here, off the import path of the app
+        from model.predictor import Predictor
+        from model.coalescer import PredictionCoalescer
+        from model.result_cache import PredictionCache
+
+        self.logger = setup_logger(__name__)
+        self.prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL) if PREDICTION_CACHE_SIZE > 0 else None
+        self.predictor = Predictor(cache=self.prediction_cache)
+        self.predictor.load_model(model_path)
+        self.predictor.warm_up()
+        self.coalescer = PredictionCoalescer(
+            self.predictor,
+            max_batch_size=int(os.environ.get('PREDICT_MAX_BATCH_SIZE', 256)),
+            max_wait_us=int(os.environ.get('PREDICT_MAX_WAIT_US', 2000))
+        )
+        self.executor = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+        self.slots = asyncio.Semaphore(INFERENCE_MAX_PENDING)
+        self.model_watcher = None
+        if MODEL_RELOAD_INTERVAL > 0:
+            self.model_watcher = ModelWatcher(model_path, self.predictor.set_model, interval=MODEL_RELOAD_INTERVAL)
+            self.model_watcher.start()
+        self.logger.info("Inference service started", extra={
+            "pid": os.getpid(),
+            "model_version": self.predictor.model_version,
+            "inference_threads": INFERENCE_THREADS,
+            "max_pending": INFERENCE_MAX_PENDING
+        })
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        try:
+            await asyncio.wait_for(self.slots.acquire(), INFERENCE_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise InferenceOverloaded("Inference queue is full, retry later")
+        try:
+            yield
+        finally:
+            self.slots.release()
+
+    async def predict_record(self, customer: CustomerData, profiled: bool = False) -> Tuple[int, Optional[str]]:
+        """Score one customer; returns the prediction and the version of the model that made it."""
+        async with self.slot():
+            if profiled:
+                # Predict on the pool in a copy of the request's context, so the profile covers the model
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.executor, contextvars.copy_context().run, self._profiled_predict_record, customer
+                )
+            if self.coalescer.max_batch_size == 1:
+                # The coalescer scores inline when it is disabled; keep that off the event loop
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.executor, contextvars.copy_context().run, self.coalescer.predict, customer
+                )
+            return await asyncio.wrap_future(self.coalescer.submit(customer))
+
+    def _profiled_predict_record(self, customer: CustomerData) -> Tuple[int, Optional[str]]:
+        with profile_stage('predict', log=False):
+            predictions, model_version = self.predictor.predict_record(customer, return_version=True)
+        return int(predictions[0]), model_version
+
+    async def predict_frame(self, df) -> tuple:
+        """Score a frame on the pool; returns the predictions and the version of the model that made them."""
+        async with self.slot():
+            # The request's context carries its logging and profiling decisions into the pool thread
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, contextvars.copy_context().run, partial(self.predictor.predict, df, return_version=True)
+            )
+
+    def close(self):
+        """Stop the model watcher and wait for running inference calls to finish."""
+        if self.model_watcher is not None:
+            self.model_watcher.stop()
+        self.executor.shutdown(wait=True)
+        self.logger.info("Inference service stopped", extra={"pid": os.getpid()})
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    # Runs once per worker process; uvicorn drains in-flight requests before the shutdown half.
+    # The InferenceService is built on a background thread unless MODEL_WARMUP=blocking.
+    app.state.warmup = ModelWarmup(InferenceService)
+    if MODEL_WARMUP != 'off':
+        app.state.warmup.start(background=MODEL_WARMUP != 'blocking')
+    try:
+        yield
+    finally:
+        # A warm-up still in progress finishes first, so its watcher and pool get closed too
+        await asyncio.get_running_loop().run_in_executor(None, app.state.warmup.wait)
+        if app.state.warmup.state is not None:
+            app.state.warmup.state.close()
+        # uvicorn re-raises the termination signal once it has shut down, which skips atexit
+        shutdown_logging()
+
+
+def _elapsed_ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 3)
+
+def _start_request(request: Request, endpoint: str) -> dict:
+    """Make the per-request sampling decisions and return the request's summary."""
+    sample_request()
+    request.state.profile_id = sample_profile(request.headers.get('x-profile'))
+    summary = {"endpoint": endpoint, "status": 500, "validation": None}
+    if request.state.profile_id:
+        summary["profile_id"] = request.state.profile_id
+    return summary
+
+class ProfileHeaderMiddleware:
+    """Adds X-Profile-Id to responses of profiled requests, so clients can find their reports."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        async def send_with_header(message):
+            profile_id = scope.get('state', {}).get('profile_id')
+            if message['type'] == 'http.response.start' and profile_id:
+                message['headers'] = list(message.get('headers', [])) + [(b'x-profile-id', profile_id.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_header)
+
+class ReadinessMiddleware:
+    """Answers 503 on the MODEL_PATHS until the worker's model is loaded and warmed up."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] in MODEL_PATHS:
+            warmup: ModelWarmup = scope['app'].state.warmup
+            if not warmup.ready:
+                record_request({"endpoint": scope['path'], "status": 503, "reason": "not_ready"})
+                response = JSONResponse({'error': "Model is not loaded yet, retry later", **warmup.status()},
+                                        status_code=503, headers={'Retry-After': '1'})
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+def _log_request_summary(summary: dict, started: float):
+    """Emit the single per-request summary event, which is kept regardless of sampling."""
+    summary["total_ms"] = _elapsed_ms(started)
+    record_request(summary)
+    logger.info("Request completed", extra={"event": SUMMARY_EVENT, **summary})
+
+async def predict(request: Request):
+    started = time.perf_counter()
+    summary = _start_request(request, "/predict")
+    service: InferenceService = request.app.state.warmup.state
+    try:
+        body = await request.body()
+        # Stages run synchronously between awaits, so their profiles only contain this request
+        with profile_stage('parse', log=False):
+            try:
+                data = json.loads(body)
+            except json.JSONDecodeError as e:
+                summary["status"] = 400
+                summary["validation"] = "invalid JSON"
+                return JSONResponse({'error': f"Invalid JSON: {e}"}, status_code=400)
+            logger.info("Received prediction request", extra={"request_data": data})
+
+            customer = CustomerData.from_json(data)
+        summary["parse_ms"] = _elapsed_ms(started)
+
+        step = time.perf_counter()
+        with profile_stage('validate', log=False):
+            is_valid, error_message = customer.validate()
+        summary["validate_ms"] = _elapsed_ms(step)
+        summary["validation"] = "ok" if is_valid else error_message
+        if not is_valid:
+            logger.info("Invalid data received", extra={"error": error_message})
+            summary["status"] = 400
+            return JSONResponse({'error': error_message}, status_code=400)
+
+        step = time.perf_counter()
+        prediction, model_version = await service.predict_record(customer, profiled=bool(request.state.profile_id))
+        summary["predict_ms"] = _elapsed_ms(step)
+        summary["prediction"] = prediction
+        # The version of the model that scored this request, even if another one was swapped in since
+        summary["model_version"] = model_version
+        logger.info("Prediction made successfully", extra={"prediction": prediction})
+
+        step = time.perf_counter()
+        with profile_stage('serialize', log=False):
+            response = JSONResponse({
+                'prediction': prediction,
+                'churn_status': 'Churn' if prediction == 1 else 'No Churn',
+                'model_version': summary["model_version"]
+            })
+        summary["serialize_ms"] = _elapsed_ms(step)
+        summary["status"] = 200
+        return response
+
+    except InferenceOverloaded as e:
+        logger.warning("Rejected prediction request", extra={"error": str(e)})
+        summary["status"] = 503
+        return JSONResponse({'error': str(e)}, status_code=503)
+    except Exception as e:
+        logger.error("Error during prediction", extra={"error": str(e)}, exc_info=True)
+        summary["error"] = str(e)
+        return JSONResponse({'error': str(e)}, status_code=500)
+    finally:
+        _log_request_summary(summary, started)
+
+async def predict_batch(request: Request):
+    started = time.perf_counter()
+    summary = _start_request(request, "/predict/batch")
+    service: InferenceService = request.app.state.warmup.state
+    try:
+        try:
+            body = await request.body()
+            with profile_stage('parse', log=False):
+                if request.headers.get('content-type', '').split(';')[0].strip() in NDJSON_MIMETYPES:
+                    records = parse_ndjson(body.decode())
+                else:
+                    records = batch_payload_records(json.loads(body))
+        except ValueError as e:
+            logger.warning("Invalid batch request", extra={"error": str(e)})
+            summary["status"] = 400
+            summary["validation"] = str(e)
+            return JSONResponse({'error': str(e)}, status_code=400)
+        summary["parse_ms"] = _elapsed_ms(started)
+        summary["rows"] = len(records)
+
+        if len(records) > BATCH_MAX_ROWS:
+            logger.warning("Batch too large", extra={"rows": len(records), "max_rows": BATCH_MAX_ROWS})
+            summary["status"] = 413
+            return JSONResponse({'error': f"Batch exceeds the maximum of {BATCH_MAX_ROWS} customers"}, status_code=413)
+
+        logger.info("Received batch prediction request", extra={"rows": len(records)})
+
+        step = time.perf_counter()
+        with profile_stage('validate', log=False, rows=len(records)):
+            df, errors = records_to_frame(records)
+            valid = errors.isna()
+        summary["validate_ms"] = _elapsed_ms(step)
+        summary["validation"] = {"valid": int(valid.sum()), "invalid": int((~valid).sum())}
+
+        step = time.perf_counter()
+        if valid.any():
+            predictions, model_version = await service.predict_frame(df[valid].reset_index(drop=True))
+        else:
+            predictions, model_version = [], service.predictor.model_version
+        summary["predict_ms"] = _elapsed_ms(step)
+        summary["churn_count"] = int(sum(predictions))
+        summary["model_version"] = model_version
+
+        logger.info("Batch prediction completed", extra={
+            "rows": len(records),
+            "scored": int(valid.sum()),
+            "failed": int((~valid).sum())
+        })
+
+        step = time.perf_counter()
+        with profile_stage('serialize', log=False, rows=len(records)):
+            response = JSONResponse({
+                'total': len(records),
+                'scored': int(valid.sum()),
+                'failed': int((~valid).sum()),
+                'model_version': summary["model_version"],
+                'results': batch_results(valid, errors, predictions)
+            })
+        summary["serialize_ms"] = _elapsed_ms(step)
+        summary["status"] = 200
+        return response
+
+    except InferenceOverloaded as e:
+        logger.warning("Rejected batch prediction request", extra={"error": str(e)})
+        summary["status"] = 503
+        return JSONResponse({'error': str(e)}, status_code=503)
+    except Exception as e:
+        logger.error("Error during batch prediction", extra={"error": str(e)}, exc_info=True)
+        summary["error"] = str(e)
+        return JSONResponse({'error': str(e)}, status_code=500)
+    finally:
+        _log_request_summary(summary, started)
+
+async def model_info(request: Request):
+    active = request.app.state.warmup.state.predictor.active_model
+    return JSONResponse({
+        'model_path': active.path,
+        'model_version': active.version,
+        'model_type': type(active.model).__name__,
+        'load_seconds': round(active.load_seconds, 4),
+        'loaded_at': active.loaded_at
+    })
+
+async def cache_stats(request: Request):
+    prediction_cache = request.app.state.warmup.state.prediction_cache
+    if prediction_cache is None:
+        return JSONResponse({'enabled': False})
+    return JSONResponse({'enabled': True, **prediction_cache.stats()})
+
+async def ready(request: Request):
+    # Readiness probe: 200 once this worker's model is loaded and warmed up, 503 before or if loading failed
+    warmup: ModelWarmup = request.app.state.warmup
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+async def metrics(request: Request):
+    # Prometheus scrape endpoint; values are per worker process
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+app = Starlette(
+    routes=[
+        Route('/predict', predict, methods=['POST']),
+        Route('/predict/batch', predict_batch, methods=['POST']),
+        Route('/model', model_info, methods=['GET']),
+        Route('/cache', cache_stats, methods=['GET']),
+        Route('/ready', ready, methods=['GET']),
+        Route('/metrics', metrics, methods=['GET']),
+    ],
+    middleware=[Middleware(ProfileHeaderMiddleware), Middleware(ReadinessMiddleware)],
+    lifespan=lifespan
+)
+
+if __name__ == '__main__':
+    import uvicorn
+    logger.info("Starting ASGI application", extra={"port": ASGI_PORT, "workers": ASGI_WORKERS})
+    uvicorn.run(
+        'main_asgi:app',
+        host=ASGI_HOST,
+        port=ASGI_PORT,
+        workers=ASGI_WORKERS,
+        loop='auto',
+        timeout_graceful_shutdown=ASGI_GRACEFUL_TIMEOUT
+    )
@@ -1,27 +1,70 @@
-from load import CSVLoader
+from load import CSVLoader, ParquetLoader
+import os
+from datetime import datetime
 import pandas as pd
+from pathlib import Path
 from model.predictor import Predictor
+from model.parallel_scorer import ParallelScorer
+from writer.file_writer import PredictionFileWriter, PARQUET_EXTENSIONS, ARROW_EXTENSIONS
+from utils.profiling import profile_stage
+
+def build_loader(input_path: str, csv_engine: str = None):
+    """Pick the loader from the file extension: Parquet for .parquet/.pq, CSV otherwise."""
+    if Path(input_path).suffix.lower() in PARQUET_EXTENSIONS:
+        return ParquetLoader(input_path)
+    return CSVLoader(input_path, engine=csv_engine)
+
+def save_predictions(predictions, output_path: str):
+    """Write predictions to a Parquet/Arrow file, or to CSV for any other extension."""
+    predictions_df = pd.DataFrame({'id': range(len(predictions)), 'predict_result': predictions})
+    with profile_stage('write', rows=len(predictions_df)):
+        if Path(output_path).suffix.lower() in PARQUET_EXTENSIONS + ARROW_EXTENSIONS:
+            with PredictionFileWriter(output_path) as writer:
+                writer.write_predictions(predictions_df)
+        else:
+            predictions_df.assign(prediction_date=datetime.now().date()).to_csv(output_path, index=False)
+
+# Rows shown in the dataset preview
+PREVIEW_ROWS = 5
 
 def main():
-    # Initialize the CSV loader with the path to the CSV file
-    loader = CSVLoader("data_base/database_input.csv")
+    # Number of scoring processes; 1 scores in this process
+    SCORING_WORKERS = int(os.environ.get('SCORING_WORKERS', 1))
+    PARTITION_BYTES = int(os.environ.get('PARTITION_BYTES', 16 * 1024 * 1024))
+    # pandas CSV parser, e.g. 'pyarrow' for the multi-threaded Arrow reader (requires pyarrow)
+    CSV_ENGINE = os.environ.get('CSV_ENGINE') or None
+    # Input file (.csv or .parquet) and optional output file (.parquet, .arrow or .csv)
+    INPUT_PATH = os.environ.get('INPUT_PATH', 'data_base/database_input.csv')
+    OUTPUT_PATH = os.environ.get('OUTPUT_PATH')
+
+    # Initialize the loader matching the input file format
+    loader = build_loader(INPUT_PATH, CSV_ENGINE)
+    
+    # Initialize the predictor
+    predictor = Predictor()
     
     try:
-        # Load the data
-        df = loader.load_data()
+        # Load only the columns the model features are built from. Scoring workers read their own
+        # partitions, so with several of them only the rows shown below are read here.
+        with profile_stage('load'):
+            if SCORING_WORKERS > 1:
+                df = next(iter(loader.load_feature_chunks(predictor.data_transformer, PREVIEW_ROWS)))
+            else:
+                df = loader.load_features(predictor.data_transformer)
         
         # Display basic information about the loaded data
         print("\nDataset Information:")
         print("-" * 50)
-        print(f"Number of rows: {len(df)}")
+        if SCORING_WORKERS == 1:
+            print(f"Number of rows: {len(df)}")
         print(f"Number of columns: {len(df.columns)}")
         print("\nColumn names:")
         for col in df.columns:
             print(f"- {col}")
             
-        print("\nFirst 5 rows of the data:")
+        print(f"\nFirst {PREVIEW_ROWS} rows of the data:")
         print("-" * 50)
-        print(df.head())
+        print(df.head(PREVIEW_ROWS))
         
         print("\nData types:")
         print("-" * 50)
@@ -30,7 +73,7 @@ def main():
     except FileNotFoundError as e:
         print(f"Error: {str(e)}")
     except pd.errors.EmptyDataError:
-        print("Error: The CSV file is empty")
+        print("Error: The input file is empty")
     except Exception as e:
         print(f"An unexpected error occurred: {str(e)}")
 
@@ -39,23 +82,33 @@ def main():
     print("=" * 50)
     print("=" * 50)
 
-    # Initialize the predictor
-    predictor = Predictor()
-
     try:
         # Load the model (replace with your actual model path)
         model_path = 'app/model/new_churn_model.pickle'
         predictor.load_model(model_path)
 
         # Make predictions
-        predictions = predictor.predict(df)
+        if SCORING_WORKERS > 1:
+            scorer = ParallelScorer(model_path, workers=SCORING_WORKERS, partition_bytes=PARTITION_BYTES)
+            if isinstance(loader, ParquetLoader):
+                predictions = scorer.score_parquet(loader.file_path)
+            else:
+                predictions = scorer.score_csv(loader.file_path)
+        else:
+            predictions = predictor.predict(df)
+
+        if OUTPUT_PATH:
+            save_predictions(predictions, OUTPUT_PATH)
 
-        # Print results
-        print("\nPredictions:")
-        for i, pred in enumerate(predictions):
-            print(f"Customer {i+1}: {'Churn' if pred == 1 else 'No Churn'}")
+        # Print summary statistics
+        churn_count = int(sum(predictions))
+        print("\nSummary Statistics:")
+        print("-" * 50)
+        print(f"Total Customers: {len(predictions)}")
+        print(f"Predicted Churns: {churn_count}")
+        print(f"Churn Rate: {churn_count / len(predictions) * 100 if len(predictions) else 0.0:.2f}%")
 
-        print("\nRun on CSV file finished successfully!!!")
+        print(f"\nRun on {loader.file_path.suffix.lstrip('.').upper()} file finished successfully!!!")
 
     except FileNotFoundError:
         print(f"Error: Model file not found at {model_path}")
@@ -1,28 +1,44 @@
-from load.db_loader import PostgresLoader
+from load.db_loader import PostgresLoader, DB_PREFETCH_DEPTH
 from model.predictor import Predictor
+from model.parallel_scorer import ParallelScorer
 from writer.db_writer import DBWriter
+from transform.data_transformer import DataTransformer
 import pandas as pd
 from utils.logger import setup_logger
+from utils.db import database_params_from_env, dispose_engines
+from utils.profiling import profile_iter, profile_stage
 import os
+import time
 
 # Initialize logger
 logger = setup_logger(__name__)
 
+# 'copy' streams predictions with COPY and upserts on id, 'to_sql' uses DataFrame.to_sql appends
+DB_WRITE_MODE = os.environ.get('DB_WRITE_MODE', 'copy')
+# 'full' scores the whole table, 'incremental' only rows that are new or changed since they were last scored
+SCORING_MODE = os.environ.get('SCORING_MODE', 'full')
+
 def main():
 
     # Get database connection parameters from environment variables
-    DB_HOST = os.environ.get('DATABASE_HOST', 'localhost')
-    DB_PORT = '5432'
-    DB_NAME = 'mlops_db'
-    DB_USER = 'mlops'
-    DB_PASS = 'mlops'
+    db_params = database_params_from_env()
+    DB_HOST = db_params['host']
+    DB_PORT = db_params['port']
+    DB_NAME = db_params['database']
+    DB_USER = db_params['user']
+    DB_PASS = db_params['password']
     
-    print(DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS)
+    # Rows per chunk; 0 loads the whole table at once
+    CHUNK_SIZE = int(os.environ.get('CHUNK_SIZE', 0))
     
-    # SQL query to fetch the data
-    QUERY = """
-select * FROM customer_data
-    """
+    # Number of scoring processes; above 1 the table is scored in parallel over id ranges
+    SCORING_WORKERS = int(os.environ.get('SCORING_WORKERS', 1))
+    PARTITION_ROWS = int(os.environ.get('PARTITION_ROWS', 100000))
+    
+    # SQL query to fetch the data: the customer id plus the columns the model features are built from
+    transformer = DataTransformer()
+    FEATURE_COLUMNS = ['id'] + transformer.source_columns
+    QUERY = PostgresLoader.build_select(FEATURE_COLUMNS, 'customer_data')
 
     try:
         logger.info("Starting database prediction process")
@@ -36,10 +52,29 @@ select * FROM customer_data
             password=DB_PASS
         )
 
+        if SCORING_MODE == 'incremental':
+            score_incrementally(loader, transformer, CHUNK_SIZE, DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS)
+            print("\nPredictions written to database successfully.")
+            logger.info("Process completed successfully")
+            return
+
+        if SCORING_WORKERS > 1:
+            score_in_parallel(SCORING_WORKERS, PARTITION_ROWS, DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS)
+            print("\nPredictions written to database successfully.")
+            logger.info("Process completed successfully")
+            return
+
+        if CHUNK_SIZE > 0:
+            score_in_chunks(loader, QUERY, CHUNK_SIZE, transformer.source_dtypes, DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS)
+            print("\nPredictions written to database successfully.")
+            logger.info("Process completed successfully")
+            return
+
         # Load data from database
         print("Loading data from database...")
         logger.info("Loading data from database")
-        df = loader.load_data(QUERY)
+        with profile_stage('load'):
+            df = loader.load_features(transformer, key_columns=['id'])
         
         # Display basic information about the loaded data
         print("\nDataset Information:")
@@ -73,12 +108,6 @@ select * FROM customer_data
         logger.info("Making predictions on loaded data")
         predictions = predictor.predict(df)
 
-        # Print results
-        print("\nPredictions:")
-        print("-" * 50)
-        for i, pred in enumerate(predictions):
-            print(f"Customer {i+1}: {'Churn' if pred == 1 else 'No Churn'}")
-
         # Print summary statistics
         churn_count = sum(predictions)
         total_customers = len(predictions)
@@ -97,15 +126,191 @@ select * FROM customer_data
         })
 
         # Write predictions to database
-        write_predictions_to_db(predictions, DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS)
+        write_predictions_to_db(predictions, df['id'], DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS)
         print("\nPredictions written to database successfully.")
         logger.info("Process completed successfully")
 
     except Exception as e:
         logger.error("Error in main process", extra={"error": str(e)}, exc_info=True)
         print(f"An error occurred: {str(e)}")
+    finally:
+        # Close the shared connection pools at the end of the run
+        dispose_engines()
+
+def score_in_chunks(loader: PostgresLoader, query: str, chunk_size: int, dtypes: dict, DB_HOST: str, DB_PORT: str, DB_NAME: str, DB_USER: str, DB_PASS: str):
+    """
+    Load, predict and write the query result one chunk at a time.
+    
+    Peak memory is bounded by the chunk size instead of the table size.
+    """
+    logger.info("Starting chunked prediction", extra={"chunk_size": chunk_size})
+
+    predictor = Predictor()
+    model_path = 'model/new_churn_model.pickle'
+    print("\nLoading model...")
+    predictor.load_model(model_path)
+
+    writer = DBWriter(
+        host=DB_HOST,
+        port=DB_PORT,
+        database=DB_NAME,
+        user=DB_USER,
+        password=DB_PASS
+    )
+
+    total_customers = 0
+    churn_count = 0
+    started = time.perf_counter()
+    chunk_started = started
+
+    for chunk_number, chunk in enumerate(profile_iter(stream_query(loader, query, chunk_size), 'load'), start=1):
+        chunk = chunk.astype(dtypes)
+        predictions = predictor.predict(chunk)
+
+        predictions_df = pd.DataFrame({
+            'id': chunk['id'].to_numpy(),
+            'predict_result': predictions
+        })
+        save_predictions(writer, predictions_df)
+
+        total_customers += len(predictions)
+        churn_count += int(sum(predictions))
+        now = time.perf_counter()
+        chunk_seconds = now - chunk_started
+        chunk_started = now
+
+        print(f"Chunk {chunk_number}: {len(predictions)} rows, {total_customers} total")
+        logger.info("Chunk processed", extra={
+            "chunk": chunk_number,
+            "rows": len(predictions),
+            "total_rows": total_customers,
+            "chunk_seconds": round(chunk_seconds, 3),
+            "rows_per_second": round(len(predictions) / chunk_seconds, 1) if chunk_seconds > 0 else None,
+            "overall_rows_per_second": round(total_customers / (now - started), 1) if now > started else None
+        })
+
+    churn_rate = (churn_count / total_customers) * 100 if total_customers else 0.0
+
+    print("\nSummary Statistics:")
+    print("-" * 50)
+    print(f"Total Customers: {total_customers}")
+    print(f"Predicted Churns: {churn_count}")
+    print(f"Churn Rate: {churn_rate:.2f}%")
+
+    logger.info("Predictions completed", extra={
+        "total_customers": total_customers,
+        "churn_count": churn_count,
+        "churn_rate": f"{churn_rate:.2f}%",
+        "seconds": round(time.perf_counter() - started, 3)
+    })
+
+def score_in_parallel(workers: int, partition_rows: int, DB_HOST: str, DB_PORT: str, DB_NAME: str, DB_USER: str, DB_PASS: str):
+    """
+    Score customer_data in worker processes over id ranges and write each partition in order.
+    """
+    db_params = {
+        'host': DB_HOST,
+        'port': DB_PORT,
+        'database': DB_NAME,
+        'user': DB_USER,
+        'password': DB_PASS
+    }
+    scorer = ParallelScorer('model/new_churn_model.pickle', workers=workers, partition_rows=partition_rows)
+    writer = DBWriter(**db_params)
+
+    total_customers = 0
+    churn_count = 0
+    for ids, predictions in scorer.iter_postgres(db_params, 'customer_data'):
+        save_predictions(writer, pd.DataFrame({'id': ids, 'predict_result': predictions}))
+        total_customers += len(predictions)
+        churn_count += int(predictions.sum())
+
+    churn_rate = (churn_count / total_customers) * 100 if total_customers else 0.0
+
+    print("\nSummary Statistics:")
+    print("-" * 50)
+    print(f"Total Customers: {total_customers}")
+    print(f"Predicted Churns: {churn_count}")
+    print(f"Churn Rate: {churn_rate:.2f}%")
+
+    logger.info("Predictions completed", extra={
+        "total_customers": total_customers,
+        "churn_count": churn_count,
+        "churn_rate": f"{churn_rate:.2f}%",
+        "workers": workers
+    })
+
+def score_incrementally(loader: PostgresLoader, transformer: DataTransformer, chunk_size: int, DB_HOST: str, DB_PORT: str, DB_NAME: str, DB_USER: str, DB_PASS: str):
+    """
+    Score only the customers that are new or changed since they were last scored.
+    
+    Each scored row's hash over the feature source columns is kept in scoring_state
+    together with the model version. A run loads the rows whose hash differs (or
+    that a different model scored), upserts their predictions by customer id and
+    then records the new hashes.
+    """
+    logger.info("Starting incremental prediction", extra={"chunk_size": chunk_size})
+
+    predictor = Predictor()
+    model_path = 'model/new_churn_model.pickle'
+    print("\nLoading model...")
+    predictor.load_model(model_path)
+
+    writer = DBWriter(
+        host=DB_HOST,
+        port=DB_PORT,
+        database=DB_NAME,
+        user=DB_USER,
+        password=DB_PASS
+    )
+    writer.ensure_state_table()
+
+    query = PostgresLoader.build_delta_select(['id'] + transformer.source_columns, transformer.source_columns)
+    params = {'model_version': predictor.model_version}
+    if chunk_size > 0:
+        chunks = profile_iter(stream_query(loader, query, chunk_size, params), 'load')
+    else:
+        with profile_stage('load'):
+            chunks = [loader.load_data(query, params=params)]
+
+    total_customers = 0
+    churn_count = 0
+    started = time.perf_counter()
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        predictions = predictor.predict(chunk.astype(transformer.source_dtypes))
+        save_predictions(writer, pd.DataFrame({'id': chunk['id'].to_numpy(), 'predict_result': predictions}))
+        writer.write_scoring_state(chunk[['id', 'row_hash']], predictor.model_version)
+        total_customers += len(predictions)
+        churn_count += int(sum(predictions))
+
+    print("\nSummary Statistics:")
+    print("-" * 50)
+    print(f"Changed Customers Scored: {total_customers}")
+    print(f"Predicted Churns: {churn_count}")
+
+    logger.info("Incremental predictions completed", extra={
+        "scored_customers": total_customers,
+        "churn_count": churn_count,
+        "model_version": predictor.model_version,
+        "seconds": round(time.perf_counter() - started, 3)
+    })
+
+def stream_query(loader: PostgresLoader, query: str, chunk_size: int, params: dict = None):
+    """Stream a query in chunks, fetching the next chunks in the background unless DB_PREFETCH_DEPTH=0."""
+    if DB_PREFETCH_DEPTH > 0:
+        return loader.load_data_prefetched(query, fetch_size=chunk_size, params=params)
+    return loader.load_data_in_chunks(query, chunk_size, params=params)
+
+def save_predictions(writer: DBWriter, predictions_df: pd.DataFrame):
+    with profile_stage('write', rows=len(predictions_df), mode=DB_WRITE_MODE):
+        if DB_WRITE_MODE == 'to_sql':
+            writer.write_predictions(predictions_df)
+        else:
+            writer.write_predictions_copy(predictions_df, upsert=True)
 
-def write_predictions_to_db(predictions: list, DB_HOST: str, DB_PORT: str, DB_NAME: str, DB_USER: str, DB_PASS: str):
+def write_predictions_to_db(predictions: list, ids, DB_HOST: str, DB_PORT: str, DB_NAME: str, DB_USER: str, DB_PASS: str):
     logger.info("Writing predictions to database")
     
     # Initialize the writer
@@ -119,12 +324,12 @@ def write_predictions_to_db(predictions: list, DB_HOST: str, DB_PORT: str, DB_NA
 
     # Create a DataFrame with predictions
     predictions_df = pd.DataFrame({
-        'id': range(len(predictions)),
+        'id': ids,
         'predict_result': predictions
     })
 
     # Write predictions to database
-    writer.write_predictions(predictions_df)
+    save_predictions(writer, predictions_df)
     logger.info("Predictions written to database successfully")
 
 if __name__ == "__main__":
@@ -1,5 +1,33 @@
+import sys
+import numpy as np
 import pandas as pd
 from model.predictor import Predictor
+from transform.data_transformer import DataTransformer
+
+def check_record_encoder_parity(sample_data: pd.DataFrame) -> bool:
+    """
+    Check that the single-record fast path encodes every row exactly like the pandas path.
+    """
+    transformer = DataTransformer()
+    for record in sample_data.to_dict('records'):
+        expected = transformer.get_features_for_prediction(
+            transformer.transform(pd.DataFrame([record]))
+        ).to_numpy(dtype=np.float64)
+        actual = transformer.transform_record(record)
+        if not np.array_equal(expected, actual, equal_nan=True):
+            print(f"Encoder mismatch for {record}: expected {expected}, got {actual}")
+            return False
+    return True
+
+def check_batch_transform_parity(dataset: pd.DataFrame) -> bool:
+    """
+    Check that the vectorized batch transform matches the pandas path and leaves its input untouched.
+    """
+    transformer = DataTransformer()
+    original = dataset.copy()
+    expected = transformer.get_features_for_prediction(transformer.transform(dataset.copy()))
+    actual = transformer.transform_batch(dataset)
+    return np.array_equal(expected.to_numpy(dtype=np.float32), actual, equal_nan=True) and dataset.equals(original)
 
 def main():
     # Create sample data that matches the expected format
@@ -18,8 +46,34 @@ def main():
         model_path = 'model/new_churn_model.pickle'
         predictor.load_model(model_path)
 
+        # Check the single-record fast path against the pandas path
+        edge_cases = pd.DataFrame({
+            'TotalCharges': [' ', None, '29.85', 0],
+            'Contract': ['Month-to-month', None, 'Two year', 'Unknown'],
+            'PhoneService': [None, 'Yes', 'No', 'Maybe'],
+            'tenure': [None, 1, 72, 0]
+        })
+        parity_data = pd.concat([sample_data.copy(), edge_cases], ignore_index=True)
+        parity_ok = check_record_encoder_parity(parity_data)
+        single_predictions = [predictor.predict(record)[0] for record in sample_data.to_dict('records')]
+        batch_parity_ok = check_batch_transform_parity(pd.concat([parity_data, parity_data], ignore_index=True))
+
+        # Check the compiled forest and lookup table engines against sklearn
+        engine_predictions = {}
+        for engine in ['compiled', 'lookup']:
+            engine_predictor = Predictor(engine=engine)
+            engine_predictor.load_model(model_path)
+            engine_predictions[engine] = engine_predictor.predict(sample_data.copy())
+
         # Make predictions
         predictions = predictor.predict(sample_data)
+        parity_ok = parity_ok and list(single_predictions) == list(predictions)
+        parity_checks = {'Single-record fast path': parity_ok, 'Batch transform': batch_parity_ok}
+        for engine, engine_result in engine_predictions.items():
+            parity_checks[f"{engine.capitalize()} engine"] = list(engine_result) == list(predictions)
+        print()
+        for check, ok in parity_checks.items():
+            print(f"{check} parity: {'OK' if ok else 'FAILED'}")
 
         # Print results
         print("\nSample Data:")
@@ -28,11 +82,17 @@ def main():
         for i, pred in enumerate(predictions):
             print(f"Customer {i+1}: {'Churn' if pred == 1 else 'No Churn'}")
 
+        # Fail the run, e.g. in CI, when any path disagrees with the pandas/sklearn path
+        if not all(parity_checks.values()):
+            sys.exit(1)
+
     except FileNotFoundError:
         print(f"Error: Model file not found at {model_path}")
         print("Please ensure the model file exists at the specified path.")
+        sys.exit(1)
     except Exception as e:
         print(f"An error occurred: {str(e)}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Optional, Tuple
+from model.predictor import Predictor
+from utils.logger import setup_logger, sample_request
+
+class PredictionCoalescer:
+    """
+    Micro-batching layer in front of a shared Predictor.
+
+    Concurrent callers submit single records; a background thread collects them
+    and scores each group with one model call. A group is flushed as soon as it
+    holds max_batch_size records or the first record in it has waited
+    max_wait_us microseconds, whichever comes first.
+    """
+
+    def __init__(self, predictor: Predictor, max_batch_size: int = 256, max_wait_us: int = 2000):
+        """
+        Initialize the coalescer.
+
+        Args:
+            predictor (Predictor): Predictor with a loaded model
+            max_batch_size (int): Maximum number of records scored in one model call
+            max_wait_us (int): Maximum time in microseconds a record waits for a batch to fill
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait_us < 0:
+            raise ValueError("max_wait_us cannot be negative")
+
+        self.logger = setup_logger(__name__)
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1_000_000
+        self._queue: "queue.Queue[tuple[Any, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.logger.info("PredictionCoalescer initialized", extra={
+            "max_batch_size": max_batch_size,
+            "max_wait_us": max_wait_us
+        })
+
+    def _ensure_worker(self):
+        # The worker is started lazily so importing the API never spawns threads
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="prediction-coalescer", daemon=True)
+                self._worker.start()
+
+    def submit(self, record: Any) -> Future:
+        """
+        Queue a single record for scoring.
+
+        Args:
+            record (Any): A CustomerData instance or a dict with the customer fields
+
+        Returns:
+            Future: Resolves to (prediction, model_version) for this record, the version being
+                that of the model that scored its batch
+        """
+        future = Future()
+        if self.max_batch_size == 1:
+            # Nothing to coalesce, score inline
+            try:
+                future.set_result(self._predict_one(record))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self._ensure_worker()
+        self._queue.put((record, future))
+        return future
+
+    def predict(self, record: Any) -> Tuple[int, Optional[str]]:
+        """
+        Score a single record, waiting for the batch it lands in.
+
+        Args:
+            record (Any): A CustomerData instance or a dict with the customer fields
+
+        Returns:
+            Tuple[int, Optional[str]]: The prediction for this record and the version of the model that made it
+        """
+        return self.submit(record).result()
+
+    def _predict_one(self, record: Any) -> Tuple[int, Optional[str]]:
+        predictions, version = self.predictor.predict_records([record], return_version=True)
+        return int(predictions[0]), version
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self._score(batch)
+
+    def _score(self, batch: List[tuple]):
+        # Each batch is sampled for detailed logging like a request would be
+        sample_request()
+        records = [record for record, _ in batch]
+        try:
+            predictions, version = self.predictor.predict_records(records, return_version=True)
+        except Exception:
+            # Fall back to scoring one by one so a bad record only fails its own caller
+            for record, future in batch:
+                try:
+                    future.set_result(self._predict_one(record))
+                except Exception as e:
+                    future.set_exception(e)
+            return
+
+        for (_, future), prediction in zip(batch, predictions):
+            future.set_result((int(prediction), version))
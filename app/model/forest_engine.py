@@ -0,0 +1,137 @@
+import numpy as np
+from typing import Any
+
+class CompiledForest:
+    """
+    Array-backed inference engine for a fitted scikit-learn RandomForestClassifier.
+
+    All trees are flattened into contiguous node arrays (feature, threshold,
+    children, normalized leaf values) and a batch is evaluated by advancing
+    every (row, tree) pair one level per step with NumPy indexing, instead of
+    dispatching to each estimator in Python.
+
+    Predictions are bit-identical to model.predict: inputs are cast to float32
+    like sklearn's input validation does, per-tree class probabilities are
+    normalized the same way and accumulated tree by tree in estimator order.
+    Rows with missing values are handed to the original model.
+    """
+
+    # Rows evaluated per block, bounding the (rows x trees) index arrays
+    BLOCK_ROWS = 4096
+
+    def __init__(self, model: Any, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, leaf_values: np.ndarray, roots: np.ndarray, max_depth: int):
+        self.model = model
+        self.classes = model.classes_
+        self.n_features = model.n_features_in_
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # children[2 * node + went_left] is the next node, so one take() advances every pair
+        self.children = np.empty(2 * len(left), dtype=np.intp)
+        self.children[0::2] = right
+        self.children[1::2] = left
+        self.leaf_values = leaf_values
+        self.roots = roots
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_model(cls, model: Any) -> "CompiledForest":
+        """
+        Flatten a fitted forest.
+
+        Args:
+            model (Any): A fitted single-output RandomForestClassifier
+
+        Returns:
+            CompiledForest: The compiled engine
+
+        Raises:
+            ValueError: If the model is not a single-output forest classifier
+        """
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators or not hasattr(model, 'classes_') or getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError(f"Cannot compile {type(model).__name__}: expected a fitted single-output forest classifier")
+
+        n_classes = len(model.classes_)
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            # Leaves point to themselves so extra traversal steps are no-ops
+            node_ids = np.arange(tree.node_count) + offset
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            model=model,
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            leaf_values=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth
+        )
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        flat = X.ravel()
+        row_offsets = (np.arange(X.shape[0]) * X.shape[1])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = flat.take(row_offsets + self.feature.take(nodes)) <= self.threshold.take(nodes)
+            nodes = self.children.take(2 * nodes + go_left)
+        return nodes
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Class probabilities, identical to model.predict_proba.
+
+        Args:
+            X: Feature matrix (array or DataFrame) in the model's feature order
+
+        Returns:
+            np.ndarray: Array of shape (n_rows, n_classes)
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got shape {X.shape}")
+        if np.isnan(X).any():
+            return self.model.predict_proba(X)
+
+        # sklearn compares the float32 input against float64 thresholds
+        X = X.astype(np.float64)
+        proba = np.zeros((X.shape[0], len(self.classes)), dtype=np.float64)
+        for start in range(0, X.shape[0], self.BLOCK_ROWS):
+            leaves = self._leaves(X[start:start + self.BLOCK_ROWS])
+            # cumsum adds strictly in tree order, matching sklearn's per-estimator accumulation
+            proba[start:start + self.BLOCK_ROWS] = np.cumsum(self.leaf_values.take(leaves, axis=0), axis=1)[:, -1]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Class predictions, identical to model.predict.
+
+        Args:
+            X: Feature matrix (array or DataFrame) in the model's feature order
+
+        Returns:
+            np.ndarray: Predicted class per row
+        """
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
@@ -0,0 +1,188 @@
+import numpy as np
+from typing import Any, Callable, List
+from transform.data_transformer import CONTRACT_COLUMNS
+
+class LookupTable:
+    """
+    Precomputed prediction table for the churn forest.
+
+    Apart from TotalCharges, the model's inputs take few values: one of three
+    contracts, PhoneService 0/1 and an integer tenure. For every such
+    combination the forest is a step function of TotalCharges, so at load time
+    each combination gets a sorted array of TotalCharges boundaries and the
+    predicted class between them. A prediction is then a table lookup plus a
+    binary search.
+
+    Boundaries are stored as float32 values, the precision sklearn compares
+    inputs at, so results are identical to model.predict. Rows outside the
+    tabulated domain (other tenures, non one-hot contracts, missing or
+    non-finite values) are scored by the fallback.
+    """
+
+    def __init__(self, model: Any, result_columns: List[str], min_tenure: int, max_tenure: int,
+                 boundaries: List[np.ndarray], outcomes: List[np.ndarray]):
+        self.model = model
+        self.classes = model.classes_
+        self.min_tenure = min_tenure
+        self.max_tenure = max_tenure
+        self.n_tenures = max_tenure - min_tenure + 1
+        self.boundaries = boundaries
+        self.outcomes = outcomes
+        self.total_charges_index = result_columns.index('TotalCharges')
+        self.phone_service_index = result_columns.index('PhoneService')
+        self.tenure_index = result_columns.index('tenure')
+        self.contract_indices = [result_columns.index(contract) for contract in CONTRACT_COLUMNS]
+        self.n_features = len(result_columns)
+
+    @classmethod
+    def from_model(cls, model: Any, result_columns: List[str], min_tenure: int = 0, max_tenure: int = 72) -> "LookupTable":
+        """
+        Build the table for a fitted single-output forest classifier.
+
+        Args:
+            model (Any): Fitted RandomForestClassifier over result_columns
+            result_columns (List[str]): Feature order the model was trained on
+            min_tenure (int): Smallest tabulated tenure
+            max_tenure (int): Largest tabulated tenure
+
+        Returns:
+            LookupTable: The precomputed table
+
+        Raises:
+            ValueError: If the model is not a single-output forest classifier
+        """
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators or not hasattr(model, 'classes_') or getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError(f"Cannot tabulate {type(model).__name__}: expected a fitted single-output forest classifier")
+
+        total_charges_index = result_columns.index('TotalCharges')
+        combos = cls._combinations(result_columns, min_tenure, max_tenure)
+
+        # Collect, per combination, the TotalCharges thresholds of every split it can reach
+        thresholds, reachable = [], []
+        for estimator in estimators:
+            tree = estimator.tree_
+            reach = np.zeros((tree.node_count, len(combos)), dtype=bool)
+            reach[0] = True
+            # Nodes are stored parents first, so one forward pass propagates reachability
+            for node in range(tree.node_count):
+                left, right = tree.children_left[node], tree.children_right[node]
+                if left == -1:
+                    continue
+                feature, threshold = tree.feature[node], tree.threshold[node]
+                if feature == total_charges_index:
+                    reach[left] |= reach[node]
+                    reach[right] |= reach[node]
+                    thresholds.append(threshold)
+                    reachable.append(reach[node])
+                else:
+                    go_left = combos[:, feature] <= threshold
+                    reach[left] |= reach[node] & go_left
+                    reach[right] |= reach[node] & ~go_left
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        reachable = np.asarray(reachable, dtype=bool).reshape(len(thresholds), len(combos))
+
+        # x goes left iff float32(x) <= threshold, i.e. iff float32(x) <= the largest float32 not above it
+        bounds = thresholds.astype(np.float32)
+        above = bounds.astype(np.float64) > thresholds
+        bounds[above] = np.nextafter(bounds[above], np.float32(-np.inf))
+
+        # One representative TotalCharges per interval: each boundary, plus one value past the last
+        combo_bounds, rows = [], []
+        for combo in range(len(combos)):
+            combo_bound = np.unique(bounds[reachable[:, combo]])
+            if len(combo_bound):
+                last = np.nextafter(combo_bound[-1], np.float32(np.inf))
+                representatives = np.append(combo_bound, last)
+            else:
+                representatives = np.zeros(1, dtype=np.float32)
+            block = np.repeat(combos[combo:combo + 1], len(representatives), axis=0)
+            block[:, total_charges_index] = representatives
+            combo_bounds.append(combo_bound)
+            rows.append(block)
+
+        class_index = {label: i for i, label in enumerate(model.classes_)}
+        predictions = model.predict(np.vstack(rows).astype(np.float32))
+        predicted = np.array([class_index[label] for label in predictions], dtype=np.intp)
+
+        # Keep only the boundaries where the predicted class changes
+        boundaries, outcomes = [], []
+        start = 0
+        for combo_bound in combo_bounds:
+            combo_outcomes = predicted[start:start + len(combo_bound) + 1]
+            start += len(combo_bound) + 1
+            changes = np.flatnonzero(combo_outcomes[1:] != combo_outcomes[:-1])
+            boundaries.append(combo_bound[changes])
+            outcomes.append(np.append(combo_outcomes[changes], combo_outcomes[-1]))
+
+        return cls(model, list(result_columns), min_tenure, max_tenure, boundaries, outcomes)
+
+    @staticmethod
+    def _combinations(result_columns: List[str], min_tenure: int, max_tenure: int) -> np.ndarray:
+        # Row order matches _combo_ids: contract, then phone service, then tenure
+        tenures = np.arange(min_tenure, max_tenure + 1)
+        combos = np.zeros((len(CONTRACT_COLUMNS) * 2 * len(tenures), len(result_columns)), dtype=np.float64)
+        row = 0
+        for contract in CONTRACT_COLUMNS:
+            for phone_service in (0, 1):
+                block = slice(row, row + len(tenures))
+                combos[block, result_columns.index(contract)] = 1
+                combos[block, result_columns.index('PhoneService')] = phone_service
+                combos[block, result_columns.index('tenure')] = tenures
+                row += len(tenures)
+        return combos
+
+    def _combo_ids(self, X: np.ndarray) -> np.ndarray:
+        # Combination index per row, -1 where the row is outside the table
+        contracts = X[:, self.contract_indices]
+        phone_service = X[:, self.phone_service_index]
+        tenure = X[:, self.tenure_index]
+        total_charges = X[:, self.total_charges_index]
+        in_domain = (
+            np.isin(contracts, (0, 1)).all(axis=1) & (contracts.sum(axis=1) == 1)
+            & np.isin(phone_service, (0, 1))
+            & (tenure == np.floor(tenure)) & (tenure >= self.min_tenure) & (tenure <= self.max_tenure)
+            & np.isfinite(total_charges.astype(np.float32))
+        )
+        ids = np.full(X.shape[0], -1, dtype=np.intp)
+        contract = contracts[in_domain].argmax(axis=1)
+        ids[in_domain] = (
+            (contract * 2 + phone_service[in_domain].astype(np.intp)) * self.n_tenures
+            + (tenure[in_domain] - self.min_tenure).astype(np.intp)
+        )
+        return ids
+
+    @property
+    def size(self) -> int:
+        """Total number of stored boundaries."""
+        return sum(len(b) for b in self.boundaries)
+
+    def predict(self, X, fallback: Callable) -> np.ndarray:
+        """
+        Predict from the table, scoring rows outside it with fallback.
+
+        Args:
+            X: Feature matrix (array or DataFrame) in result_columns order
+            fallback (Callable): Function scoring the rows the table does not cover
+
+        Returns:
+            np.ndarray: Predicted class per row
+        """
+        features = np.asarray(X, dtype=np.float64)
+        if features.ndim != 2 or features.shape[1] != self.n_features:
+            return fallback(X)
+
+        ids = self._combo_ids(features)
+        total_charges = features[:, self.total_charges_index].astype(np.float32)
+        outcome = np.empty(features.shape[0], dtype=np.intp)
+        for combo in np.unique(ids[ids >= 0]):
+            rows = ids == combo
+            position = np.searchsorted(self.boundaries[combo], total_charges[rows], side='left')
+            outcome[rows] = self.outcomes[combo][position]
+
+        predictions = np.empty(features.shape[0], dtype=self.classes.dtype)
+        covered = ids >= 0
+        predictions[covered] = self.classes.take(outcome[covered])
+        if not covered.all():
+            predictions[~covered] = fallback(X[~covered] if isinstance(X, np.ndarray) else X.iloc[np.flatnonzero(~covered)])
+        return predictions
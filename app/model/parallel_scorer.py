@@ -0,0 +1,263 @@
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from typing import Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from model.predictor import Predictor
+from transform.data_transformer import SOURCE_COLUMNS
+from utils.logger import setup_logger
+from utils.profiling import profile_stage
+
+# Per-process state, populated once by the pool initializer
+_worker_predictor: Optional[Predictor] = None
+_worker_loader = None
+
+
+def _init_worker(model_path: str, db_params: Optional[dict] = None):
+    global _worker_predictor, _worker_loader
+    _worker_predictor = Predictor()
+    _worker_predictor.load_model(model_path)
+    if db_params is not None:
+        from load.db_loader import PostgresLoader
+        _worker_loader = PostgresLoader(**db_params)
+
+
+def _score_csv_range(file_path: str, columns: List[str], start: int, end: int) -> np.ndarray:
+    transformer = _worker_predictor.data_transformer
+    with profile_stage('load', offset=start):
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        df = pd.read_csv(io.BytesIO(data), header=None, names=columns, usecols=transformer.source_columns,
+                         dtype=transformer.source_dtypes, na_values=[' '])
+    return np.asarray(_worker_predictor.predict(df))
+
+
+def _score_parquet_row_group(file_path: str, row_group: int) -> np.ndarray:
+    import pyarrow.parquet as pq
+    transformer = _worker_predictor.data_transformer
+    with profile_stage('load', row_group=row_group):
+        df = pq.ParquetFile(file_path, memory_map=True).read_row_group(
+            row_group, columns=transformer.source_columns
+        ).to_pandas().astype(transformer.source_dtypes)
+    return np.asarray(_worker_predictor.predict(df))
+
+
+def _score_frame(df: pd.DataFrame) -> np.ndarray:
+    return np.asarray(_worker_predictor.predict(df))
+
+
+def _score_id_range(query: str) -> Tuple[np.ndarray, np.ndarray]:
+    with profile_stage('load'):
+        df = _worker_loader.load_data(query).astype(_worker_predictor.data_transformer.source_dtypes)
+    if df.empty:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return df['id'].to_numpy(), np.asarray(_worker_predictor.predict(df))
+
+
+def _concatenate(results: Iterable[np.ndarray]) -> np.ndarray:
+    results = list(results)
+    return np.concatenate(results) if results else np.empty(0, dtype=np.int64)
+
+
+class ParallelScorer:
+    """
+    Multi-process scoring engine built on Predictor.
+
+    The input is split into partitions (byte ranges of a CSV file, row groups
+    of a Parquet file or id ranges of a PostgreSQL table) which are scored in a ProcessPoolExecutor. Each
+    worker loads the model once through the pool initializer, and results are
+    returned in partition order. At most two partitions per worker are in
+    flight, so partitions are submitted only as fast as their results are
+    consumed.
+    """
+
+    def __init__(self, model_path: str, workers: Optional[int] = None,
+                 partition_rows: int = 100_000, partition_bytes: int = 16 * 1024 * 1024):
+        """
+        Initialize the parallel scorer.
+
+        Args:
+            model_path (str): Path to the pickle file containing the model
+            workers (Optional[int]): Number of worker processes (default: number of CPUs)
+            partition_rows (int): Width of the id range scored per partition for PostgreSQL
+            partition_bytes (int): Approximate size in bytes of a CSV partition
+        """
+        self.logger = setup_logger(__name__)
+        self.model_path = model_path
+        self.workers = workers or os.cpu_count() or 1
+        self.partition_rows = partition_rows
+        self.partition_bytes = partition_bytes
+        self.logger.info("ParallelScorer initialized", extra={
+            "model_path": model_path,
+            "workers": self.workers,
+            "partition_rows": partition_rows,
+            "partition_bytes": partition_bytes
+        })
+
+    def csv_partitions(self, file_path: str) -> Tuple[List[str], List[Tuple[int, int]]]:
+        """
+        Split a CSV file into byte ranges aligned to line boundaries.
+
+        Records must not contain embedded newlines, which holds for the Telco exports.
+
+        Args:
+            file_path (str): Path to the CSV file
+
+        Returns:
+            Tuple[List[str], List[Tuple[int, int]]]: The header columns and the (start, end) byte ranges
+        """
+        size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as f:
+            header = f.readline()
+            columns = pd.read_csv(io.BytesIO(header)).columns.tolist()
+            offsets = [f.tell()]
+            while offsets[-1] < size:
+                f.seek(min(offsets[-1] + self.partition_bytes, size))
+                f.readline()
+                offsets.append(min(f.tell(), size))
+        ranges = [(start, end) for start, end in zip(offsets, offsets[1:]) if end > start]
+        return columns, ranges
+
+    def iter_csv(self, file_path: str) -> Iterator[np.ndarray]:
+        """
+        Score a CSV file in parallel, yielding the predictions of each partition.
+
+        Args:
+            file_path (str): Path to the CSV file
+
+        Yields:
+            np.ndarray: Predictions per byte range, in file order
+        """
+        columns, ranges = self.csv_partitions(file_path)
+        self.logger.info("Scoring CSV in parallel", extra={
+            "file_path": str(file_path),
+            "partitions": len(ranges),
+            "workers": self.workers
+        })
+        yield from self._score_partitions(
+            _score_csv_range, (), repeat(file_path), repeat(columns),
+            [start for start, _ in ranges], [end for _, end in ranges]
+        )
+
+    def score_csv(self, file_path: str) -> np.ndarray:
+        """
+        Score a CSV file in parallel.
+
+        Args:
+            file_path (str): Path to the CSV file
+
+        Returns:
+            np.ndarray: Predictions in file order
+        """
+        return _concatenate(self.iter_csv(file_path))
+
+    def iter_parquet(self, file_path: str) -> Iterator[np.ndarray]:
+        """
+        Score a Parquet file in parallel, one row group per partition.
+
+        Args:
+            file_path (str): Path to the Parquet file
+
+        Yields:
+            np.ndarray: Predictions per row group, in file order
+        """
+        import pyarrow.parquet as pq
+        row_groups = list(range(pq.ParquetFile(file_path).num_row_groups))
+        self.logger.info("Scoring Parquet file in parallel", extra={
+            "file_path": str(file_path),
+            "partitions": len(row_groups),
+            "workers": self.workers
+        })
+        yield from self._score_partitions(_score_parquet_row_group, (), repeat(str(file_path)), row_groups)
+
+    def score_parquet(self, file_path: str) -> np.ndarray:
+        """
+        Score a Parquet file in parallel, one row group per partition.
+
+        Args:
+            file_path (str): Path to the Parquet file
+
+        Returns:
+            np.ndarray: Predictions in file order
+        """
+        return _concatenate(self.iter_parquet(file_path))
+
+    def iter_postgres(self, db_params: dict, table_name: str = 'customer_data') -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Score a PostgreSQL table in parallel over id ranges.
+
+        Args:
+            db_params (dict): PostgresLoader keyword arguments (host, port, database, user, password)
+            table_name (str): Table to score; it must have an integer id column
+
+        Yields:
+            Tuple[np.ndarray, np.ndarray]: Customer ids and predictions per partition, in id order
+        """
+        from load.db_loader import PostgresLoader
+        columns = ['id'] + SOURCE_COLUMNS
+        bounds = PostgresLoader(**db_params).load_data(
+            f"select min(id) as min_id, max(id) as max_id from {table_name}"
+        )
+        min_id, max_id = bounds.iloc[0]['min_id'], bounds.iloc[0]['max_id']
+        if pd.isna(min_id):
+            return
+        queries = [
+            PostgresLoader.build_select(columns, table_name,
+                                        f"id >= {lo} and id < {lo + self.partition_rows} order by id")
+            for lo in range(int(min_id), int(max_id) + 1, self.partition_rows)
+        ]
+        self.logger.info("Scoring PostgreSQL table in parallel", extra={
+            "table": table_name,
+            "partitions": len(queries),
+            "workers": self.workers
+        })
+        yield from self._score_partitions(_score_id_range, (db_params,), queries)
+
+    def score_frames(self, frames: Iterable[pd.DataFrame]) -> Iterator[np.ndarray]:
+        """
+        Score a stream of DataFrames in parallel, yielding predictions in input order.
+
+        At most two frames per worker are in flight, so frames are pulled from
+        the iterable only as fast as the workers score them and memory stays
+        bounded for streams of any length.
+
+        Args:
+            frames (Iterable[pd.DataFrame]): Frames with the transformer's source columns
+
+        Yields:
+            np.ndarray: Predictions for each frame
+        """
+        self.logger.info("Scoring frames in parallel", extra={"workers": self.workers})
+        yield from self._score_partitions(_score_frame, (), frames)
+
+    def _score_partitions(self, task, init_args: tuple, *arguments: Iterable) -> Iterator:
+        # Runs task over the zipped arguments in a fresh pool and yields the results in order.
+        # Two tasks per worker are in flight; the next one is submitted as each result is taken.
+        started = time.perf_counter()
+        rows = partitions = 0
+        pending_args = zip(*arguments)
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.model_path, *init_args)) as executor:
+            pending = deque(executor.submit(task, *args) for args in islice(pending_args, 2 * self.workers))
+            while pending:
+                result = pending.popleft().result()
+                pending.extend(executor.submit(task, *args) for args in islice(pending_args, 1))
+                partitions += 1
+                # Partitions of a table return (ids, predictions)
+                rows += len(result[1] if isinstance(result, tuple) else result)
+                yield result
+        self._log_throughput(rows, partitions, started)
+
+    def _log_throughput(self, rows: int, partitions: int, started: float):
+        seconds = time.perf_counter() - started
+        self.logger.info("Parallel scoring completed", extra={
+            "rows": rows,
+            "partitions": partitions,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None
+        })
@@ -1,35 +1,115 @@
+import numpy as np
+import os
 import pandas as pd
-import pickle
-from typing import List
+import time
+import warnings
+from typing import Any, Callable, List, Optional, Tuple, Union
+from model.forest_engine import CompiledForest
+from model.lookup_engine import LookupTable
+from model.registry import LoadedModel, ModelRegistry, default_registry
+from model.result_cache import PredictionCache
 from transform.data_transformer import DataTransformer
 from utils.logger import setup_logger
+from utils.metrics import Counter, Histogram
+from utils.profiling import profile_stage
+
+# Inference engine: 'sklearn' calls model.predict, 'compiled' uses CompiledForest for every
+# call, 'auto' uses CompiledForest for batches up to COMPILED_MAX_ROWS rows and sklearn above,
+# 'lookup' uses a LookupTable built at load time and model.predict for rows outside it
+PREDICTOR_ENGINE = os.environ.get('PREDICTOR_ENGINE', 'sklearn')
+COMPILED_MAX_ROWS = int(os.environ.get('COMPILED_MAX_ROWS', 4096))
+LOOKUP_MAX_TENURE = int(os.environ.get('LOOKUP_MAX_TENURE', 72))
+ENGINES = ('sklearn', 'compiled', 'auto', 'lookup')
+
+# Customers scored by warm_up() on both the record and the batch path
+WARMUP_RECORDS = [
+    {'TotalCharges': 29.85, 'Contract': 'Month-to-month', 'PhoneService': 'No', 'tenure': 1.0},
+    {'TotalCharges': 1889.5, 'Contract': 'One year', 'PhoneService': 'Yes', 'tenure': 34.0},
+]
+
+# 'record' covers the single-record fast path (also used for coalesced groups), 'batch' DataFrame input
+TRANSFORM_SECONDS = Histogram('churn_transform_seconds', 'Time spent encoding input into features per call', ['path'])
+MODEL_PREDICT_SECONDS = Histogram('churn_model_predict_seconds', 'Time spent in the model per scoring call', ['path'])
+PREDICTIONS_TOTAL = Counter('churn_predictions_total', 'Predictions served by outcome', ['outcome'])
+_TRANSFORM_RECORD, _TRANSFORM_BATCH = TRANSFORM_SECONDS.labels('record'), TRANSFORM_SECONDS.labels('batch')
+_MODEL_RECORD, _MODEL_BATCH = MODEL_PREDICT_SECONDS.labels('record'), MODEL_PREDICT_SECONDS.labels('batch')
+_CHURN, _NO_CHURN = PREDICTIONS_TOTAL.labels('churn'), PREDICTIONS_TOTAL.labels('no_churn')
+
+
+# sklearn's warning for arrays scored by a model fitted on a DataFrame
+_FEATURE_NAMES_WARNING = 'X does not have valid feature names'
+
+
+def _unnamed_predict(model) -> Callable:
+    """
+    model.predict for plain feature matrices in result_columns order.
+    
+    The transforms hand the model NumPy arrays, which sklearn flags when the model
+    was fitted on a DataFrame; the order is guaranteed, so the warning is silenced
+    for these calls only instead of for the whole process.
+    """
+    def predict(features):
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message=_FEATURE_NAMES_WARNING, category=UserWarning)
+            return model.predict(features)
+    return predict
+
+
+def _count_outcomes(predictions: np.ndarray):
+    churn = int(np.count_nonzero(np.asarray(predictions) == 1))
+    _CHURN.inc(churn)
+    _NO_CHURN.inc(len(predictions) - churn)
 
 class Predictor:
     """
     A class to handle model loading and prediction functionality.
     """
     
-    def __init__(self):
+    def __init__(self, registry: Optional[ModelRegistry] = None, cache: Optional[PredictionCache] = None,
+                 engine: Optional[str] = None):
         self.logger = setup_logger(__name__)
         self.data_transformer = DataTransformer()
-        self.model = None
-        self.logger.info("Predictor initialized")
+        self.registry = registry or default_registry
+        self.cache = cache
+        self.engine = engine or PREDICTOR_ENGINE
+        if self.engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{self.engine}', expected one of: {', '.join(ENGINES)}")
+        # The loaded model and the function that scores a feature matrix with it,
+        # swapped together as one reference
+        self._active: Optional[Tuple[LoadedModel, Callable]] = None
+        self.logger.info("Predictor initialized", extra={"engine": self.engine})
+    
+    @property
+    def active_model(self) -> Optional[LoadedModel]:
+        """The LoadedModel currently used for predictions, or None before load_model()."""
+        active = self._active
+        return active[0] if active is not None else None
+    
+    @property
+    def model(self):
+        """The model currently used for predictions, or None before load_model()."""
+        active = self.active_model
+        return active.model if active is not None else None
+    
+    @property
+    def model_version(self) -> Optional[str]:
+        """Content-hash version of the active model, or None before load_model()."""
+        active = self.active_model
+        return active.version if active is not None else None
     
     def load_model(self, model_path: str):
         """
         Load the trained model from a pickle file.
         
+        The model comes from the shared registry, so loading an artifact that is
+        already in memory does not deserialize it again.
+        
         Args:
-            model_path (str): Path to the pickle file containing the model
+            model_path (str): Path to the pickle (or .joblib) file containing the model
         """
         try:
             self.logger.info("Loading model from file", extra={"model_path": model_path})
-            with open(model_path, 'rb') as f:
-                self.model = pickle.load(f)
-            self.logger.info("Model loaded successfully", extra={
-                "model_type": type(self.model).__name__,
-                "model_path": model_path
-            })
+            self.set_model(self.registry.load(model_path))
         except Exception as e:
             self.logger.error("Error loading model", extra={
                 "error": str(e),
@@ -37,30 +117,122 @@ class Predictor:
             }, exc_info=True)
             raise
     
-    def predict(self, dataset: pd.DataFrame) -> List[int]:
+    def set_model(self, loaded: LoadedModel):
+        """
+        Atomically switch to an already loaded model.
+        
+        Predictions that are in flight finish with the model they started with.
+        
+        Args:
+            loaded (LoadedModel): The model to activate
+        """
+        previous_version = self.model_version
+        self._active = (loaded, self._build_scorer(loaded))
+        if self.cache is not None and previous_version != loaded.version:
+            self.cache.clear()
+        self.logger.info("Model loaded successfully", extra={
+            "model_type": type(loaded.model).__name__,
+            "model_path": loaded.path,
+            "model_version": loaded.version,
+            "previous_version": previous_version,
+            "load_seconds": round(loaded.load_seconds, 4)
+        })
+    
+    def _build_scorer(self, loaded: LoadedModel) -> Callable:
+        model_predict = _unnamed_predict(loaded.model)
+        if self.engine == 'sklearn':
+            return model_predict
+        if self.engine == 'lookup':
+            return self._build_lookup_scorer(loaded, model_predict)
+        try:
+            compiled = CompiledForest.from_model(loaded.model)
+        except ValueError as e:
+            self.logger.warning("Compiled engine unavailable, using sklearn", extra={
+                "error": str(e),
+                "model_version": loaded.version
+            })
+            return model_predict
+        if self.engine == 'compiled':
+            return compiled.predict
+        
+        def score(features):
+            if len(features) <= COMPILED_MAX_ROWS:
+                return compiled.predict(features)
+            return model_predict(features)
+        return score
+    
+    def _build_lookup_scorer(self, loaded: LoadedModel, model_predict: Callable) -> Callable:
+        try:
+            started = time.perf_counter()
+            # Building the table scores arrays of every combination with the model
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', message=_FEATURE_NAMES_WARNING, category=UserWarning)
+                table = LookupTable.from_model(
+                    loaded.model, self.data_transformer.result_columns, max_tenure=LOOKUP_MAX_TENURE
+                )
+        except ValueError as e:
+            self.logger.warning("Lookup engine unavailable, using sklearn", extra={
+                "error": str(e),
+                "model_version": loaded.version
+            })
+            return model_predict
+        self.logger.info("Lookup table built", extra={
+            "model_version": loaded.version,
+            "boundaries": table.size,
+            "build_seconds": round(time.perf_counter() - started, 3)
+        })
+        
+        def score(features):
+            return table.predict(features, model_predict)
+        return score
+    
+    def _score(self, features, active: Optional[Tuple[LoadedModel, Callable]] = None) -> np.ndarray:
+        return (active or self._active)[1](features)
+    
+    def _require_model(self) -> Tuple[LoadedModel, Callable]:
+        # One snapshot per call, so a hot swap cannot mix models (or versions) within it
+        active = self._active
+        if active is None:
+            self.logger.error("Model not loaded")
+            raise ValueError("Model not loaded. Please load the model first using load_model()")
+        return active
+    
+    def predict(self, dataset: Union[pd.DataFrame, Any], return_version: bool = False):
         """
         Make predictions using the loaded model.
         
         Args:
-            dataset (pd.DataFrame): Dataset to make predictions on
+            dataset (Union[pd.DataFrame, Any]): Dataset to make predictions on, or a
+                single record (CustomerData or dict), which takes the pandas-free fast path
+            return_version (bool): Also return the version of the model that made the predictions
             
         Returns:
-            List[int]: List of predictions
+            List[int]: List of predictions, or a (predictions, model_version) tuple with return_version
         """
+        if not isinstance(dataset, pd.DataFrame):
+            return self.predict_record(dataset, return_version=return_version)
+        if len(dataset) == 1:
+            return self.predict_record(dataset.to_dict('records')[0], return_version=return_version)
+
         try:
-            if not hasattr(self, 'model'):
-                self.logger.error("Model not loaded")
-                raise ValueError("Model not loaded. Please load the model first using load_model()")
+            active = self._require_model()
             
             self.logger.info("Starting prediction process", extra={
                 "input_rows": len(dataset),
                 "input_columns": list(dataset.columns)
             })
             
-            transformed_data = self.data_transformer.transform(dataset)
-            features = self.data_transformer.get_features_for_prediction(transformed_data)
+            # Vectorized transform that leaves the caller's frame untouched; it also selects the feature columns
+            with profile_stage('transform', rows=len(dataset)):
+                started = time.perf_counter()
+                features = self.data_transformer.transform_batch(dataset)
+                _TRANSFORM_BATCH.observe(time.perf_counter() - started)
             
-            predictions = self.model.predict(features)
+            with profile_stage('predict', rows=len(dataset)):
+                started = time.perf_counter()
+                predictions = self._score(features, active)
+                _MODEL_BATCH.observe(time.perf_counter() - started)
+            _count_outcomes(predictions)
             
             # Log prediction statistics
             prediction_counts = pd.Series(predictions).value_counts().to_dict()
@@ -69,11 +241,128 @@ class Predictor:
                 "prediction_distribution": prediction_counts
             })
             
-            return predictions
+            return (predictions, active[0].version) if return_version else predictions
             
         except Exception as e:
             self.logger.error("Error during prediction", extra={
                 "error": str(e),
                 "input_shape": dataset.shape
             }, exc_info=True)
-            raise 
\ No newline at end of file
+            raise 
+
+    def _predict_rows(self, features: np.ndarray, active: Tuple[LoadedModel, Callable]) -> np.ndarray:
+        # Encoded rows go through the result cache when one is configured
+        loaded, score = active
+        if self.cache is None:
+            started = time.perf_counter()
+            predictions = score(features)
+            _MODEL_RECORD.observe(time.perf_counter() - started)
+            _count_outcomes(predictions)
+            return predictions
+        
+        keys = [PredictionCache.make_key(loaded.version, row) for row in features]
+        cached = [self.cache.get(key) for key in keys]
+        missing = [i for i, value in enumerate(cached) if value is None]
+        if missing:
+            started = time.perf_counter()
+            computed = score(features[missing])
+            _MODEL_RECORD.observe(time.perf_counter() - started)
+            for i, value in zip(missing, computed):
+                cached[i] = value
+                self.cache.put(keys[i], value)
+        predictions = np.asarray(cached)
+        _count_outcomes(predictions)
+        return predictions
+
+    def predict_record(self, record: Any, return_version: bool = False):
+        """
+        Make a prediction for a single record without building a DataFrame.
+        
+        Args:
+            record (Any): A CustomerData instance or a dict with the customer fields
+            return_version (bool): Also return the version of the model that made the prediction
+            
+        Returns:
+            List[int]: List with a single prediction, or a (predictions, model_version) tuple with return_version
+        """
+        try:
+            active = self._require_model()
+            
+            started = time.perf_counter()
+            features = self.data_transformer.transform_record(record)
+            _TRANSFORM_RECORD.observe(time.perf_counter() - started)
+            predictions = self._predict_rows(features, active)
+            
+            self.logger.info("Prediction completed", extra={
+                "total_predictions": 1,
+                "prediction": int(predictions[0])
+            })
+            
+            return (predictions, active[0].version) if return_version else predictions
+            
+        except Exception as e:
+            self.logger.error("Error during record prediction", extra={
+                "error": str(e)
+            }, exc_info=True)
+            raise
+
+    def predict_records(self, records: List[Any], return_version: bool = False):
+        """
+        Make predictions for several single records with one model call.
+        
+        Each record is encoded with the pandas-free fast path and the rows are
+        stacked into one matrix, so the model is invoked once for the whole group.
+        
+        Args:
+            records (List[Any]): CustomerData instances or dicts with the customer fields
+            return_version (bool): Also return the version of the model that made the predictions
+            
+        Returns:
+            List[int]: List of predictions, one per record, or a (predictions, model_version)
+                tuple with return_version
+        """
+        try:
+            active = self._require_model()
+            
+            started = time.perf_counter()
+            features = np.vstack([self.data_transformer.transform_record(record) for record in records])
+            _TRANSFORM_RECORD.observe(time.perf_counter() - started)
+            predictions = self._predict_rows(features, active)
+            
+            self.logger.info("Predictions completed", extra={
+                "total_predictions": len(predictions)
+            })
+            
+            return (predictions, active[0].version) if return_version else predictions
+            
+        except Exception as e:
+            self.logger.error("Error during records prediction", extra={
+                "error": str(e),
+                "records": len(records)
+            }, exc_info=True)
+            raise
+
+    def warm_up(self) -> float:
+        """
+        Score WARMUP_RECORDS once so the first request does not pay for lazy initialization.
+        
+        The records go through the record encoder, the batch transform and the
+        active scorer, bypassing the result cache and the prediction metrics.
+        
+        Returns:
+            float: Seconds the warm-up took
+            
+        Raises:
+            ValueError: If no model is loaded
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Please load the model first using load_model()")
+        started = time.perf_counter()
+        self._score(np.vstack([self.data_transformer.transform_record(record) for record in WARMUP_RECORDS]))
+        self._score(self.data_transformer.transform_batch(pd.DataFrame(WARMUP_RECORDS)))
+        seconds = time.perf_counter() - started
+        self.logger.info("Predictor warmed up", extra={
+            "model_version": self.model_version,
+            "warmup_seconds": round(seconds, 4)
+        })
+        return seconds
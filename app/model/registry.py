@@ -0,0 +1,189 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
+from utils.logger import setup_logger
+
+# Maximum number of distinct model artifacts kept in memory
+MODEL_CACHE_SIZE = int(os.environ.get('MODEL_CACHE_SIZE', 2))
+# mmap mode for joblib artifacts ('r' maps the tree arrays read-only, '' loads them into memory)
+MODEL_MMAP_MODE = os.environ.get('MODEL_MMAP_MODE', 'r') or None
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    A model together with the artifact it was loaded from.
+    """
+    model: Any
+    path: str
+    version: str
+    load_seconds: float
+    loaded_at: float
+
+
+def file_signature(path: str) -> Tuple[int, int]:
+    """Cheap change detector for an artifact: (mtime in ns, size in bytes)."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of the artifact content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Loads model artifacts and memoizes them by path and content hash.
+
+    Loading the same unchanged file twice returns the already deserialized
+    model. Artifacts ending in .joblib are loaded with joblib, memory-mapping
+    their arrays when MODEL_MMAP_MODE is set, which keeps large tree ensembles
+    out of the process heap and shares them between processes.
+    """
+
+    def __init__(self, max_models: int = MODEL_CACHE_SIZE):
+        """
+        Initialize the registry.
+
+        Args:
+            max_models (int): Maximum number of loaded models kept in the cache
+        """
+        self.logger = setup_logger(__name__)
+        self.max_models = max_models
+        self._models: "OrderedDict[Tuple[str, str], LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _deserialize(self, path: str) -> Any:
+        if path.endswith('.joblib'):
+            import joblib
+            return joblib.load(path, mmap_mode=MODEL_MMAP_MODE)
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def load(self, model_path: str) -> LoadedModel:
+        """
+        Return the model stored at model_path, deserializing it only if its content is new.
+
+        Args:
+            model_path (str): Path to the model artifact
+
+        Returns:
+            LoadedModel: The model and its version (a prefix of the content hash)
+        """
+        path = os.path.abspath(model_path)
+        version = file_hash(path)[:12]
+        key = (path, version)
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+
+            started = time.perf_counter()
+            model = self._deserialize(path)
+            loaded = LoadedModel(
+                model=model,
+                path=path,
+                version=version,
+                load_seconds=time.perf_counter() - started,
+                loaded_at=time.time()
+            )
+            self._models[key] = loaded
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+
+        self.logger.info("Model artifact deserialized", extra={
+            "model_path": path,
+            "model_version": version,
+            "load_seconds": round(loaded.load_seconds, 4)
+        })
+        return loaded
+
+
+# Registry shared by every Predictor in the process
+default_registry = ModelRegistry()
+
+
+class ModelWatcher:
+    """
+    Polls a model artifact and hands a newly loaded model to a callback when the file changes.
+
+    The new model is fully deserialized before the callback runs, so the swap
+    itself is a single reference assignment and in-flight predictions keep
+    using the model they started with.
+    """
+
+    def __init__(self, model_path: str, on_change: Callable[[LoadedModel], None],
+                 interval: float = 10.0, registry: Optional[ModelRegistry] = None):
+        """
+        Initialize the watcher.
+
+        Args:
+            model_path (str): Path to the model artifact to watch
+            on_change (Callable[[LoadedModel], None]): Called with the new model after a change
+            interval (float): Seconds between checks
+            registry (Optional[ModelRegistry]): Registry used to load the model (default: shared registry)
+        """
+        self.logger = setup_logger(__name__)
+        self.model_path = model_path
+        self.on_change = on_change
+        self.interval = interval
+        self.registry = registry or default_registry
+        self._signature = file_signature(model_path)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start watching in a daemon thread; after a fork this restarts watching in the child."""
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+        self.logger.info("Watching model artifact", extra={
+            "model_path": self.model_path,
+            "interval": self.interval
+        })
+
+    def stop(self):
+        """Stop watching."""
+        self._stop.set()
+
+    def check(self) -> bool:
+        """
+        Reload the model if the artifact changed since the last check.
+
+        Returns:
+            bool: True if a new model was handed to the callback
+        """
+        try:
+            signature = file_signature(self.model_path)
+        except OSError:
+            # The file is being replaced; try again on the next check
+            return False
+        if signature == self._signature:
+            return False
+
+        try:
+            loaded = self.registry.load(self.model_path)
+        except Exception as e:
+            self.logger.error("Error reloading model, keeping the current one", extra={
+                "error": str(e),
+                "model_path": self.model_path
+            }, exc_info=True)
+            return False
+
+        self._signature = signature
+        self.on_change(loaded)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
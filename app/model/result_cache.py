@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+import numpy as np
+from utils.logger import setup_logger
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predictions with an optional time-to-live.
+
+    Keys are built from the model version and the encoded feature row, so a
+    new model never serves results computed by the previous one; clear() is
+    called on model changes to release the old entries right away.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of cached predictions
+            ttl_seconds (float): Lifetime of an entry in seconds; 0 keeps entries until evicted
+        """
+        self.logger = setup_logger(__name__)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.logger.info("PredictionCache initialized", extra={
+            "max_entries": max_entries,
+            "ttl_seconds": ttl_seconds
+        })
+
+    @staticmethod
+    def make_key(model_version: Optional[str], row: np.ndarray) -> Hashable:
+        """
+        Build the cache key for one encoded feature row.
+
+        Args:
+            model_version (Optional[str]): Version of the model producing the prediction
+            row (np.ndarray): Encoded row in DataTransformer.result_columns order
+
+        Returns:
+            Hashable: The cache key
+        """
+        return model_version, np.ascontiguousarray(row, dtype=np.float64).tobytes()
+
+    def get(self, key: Hashable):
+        """
+        Look up a prediction.
+
+        Returns:
+            The cached prediction, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value):
+        """Store a prediction, evicting the least recently used entries beyond max_entries."""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries, e.g. after a model change."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,93 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+from utils.logger import setup_logger
+
+
+class ModelWarmup:
+    """
+    Start-up of an API's model state, run on a background thread.
+
+    The server can accept connections (readiness probes, /metrics) right away
+    while the build function imports the model stack, loads the model and runs
+    a warm-up prediction. Endpoints that need the model answer 503 until
+    ready is True; a failed build stays not ready and reports its error.
+    """
+
+    def __init__(self, build: Callable[[], Any], name: str = "model-warmup"):
+        """
+        Initialize the warm-up.
+
+        Args:
+            build (Callable[[], Any]): Loads the model and returns the serving state, available as `state`
+            name (str): Name of the background thread
+        """
+        self.logger = setup_logger(__name__)
+        self.build = build
+        self.name = name
+        self.state: Any = None
+        self.error: Optional[BaseException] = None
+        self.seconds: Optional[float] = None
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, background: bool = True) -> "ModelWarmup":
+        """
+        Run the build function.
+
+        Args:
+            background (bool): Run it on a daemon thread; otherwise run it now and
+                re-raise its error, like a model loaded at import
+
+        Returns:
+            ModelWarmup: self
+        """
+        if background:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        else:
+            self._run()
+            if self.error is not None:
+                raise self.error
+        return self
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            self.logger.info("Model warm-up started", extra={"warmup_thread": threading.current_thread().name})
+            self.state = self.build()
+        except Exception as e:
+            self.error = e
+            self.logger.error("Model warm-up failed", extra={"error": str(e)}, exc_info=True)
+        finally:
+            self.seconds = round(time.perf_counter() - started, 3)
+            self._done.set()
+        if self.error is None:
+            self.logger.info("Model warm-up completed", extra={"warmup_seconds": self.seconds})
+
+    @property
+    def ready(self) -> bool:
+        """True once the build function has returned without an error."""
+        return self._done.is_set() and self.error is None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the warm-up has finished; returns at once when it was never started.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait at most; None waits until it finishes
+
+        Returns:
+            bool: Whether the service is ready
+        """
+        if self._thread is None:
+            return self.ready
+        self._done.wait(timeout)
+        return self.ready
+
+    def status(self) -> dict:
+        """Readiness report for the /ready endpoint."""
+        status = {'ready': self.ready, 'warmup_seconds': self.seconds}
+        if self.error is not None:
+            status['error'] = str(self.error)
+        return status
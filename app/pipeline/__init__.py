@@ -0,0 +1,3 @@
+"""
+Chunked batch scoring pipeline behind the churn-score CLI.
+"""
@@ -0,0 +1,197 @@
+import importlib
+import os
+import re
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Tuple
+from writer.file_writer import PARQUET_EXTENSIONS, ARROW_EXTENSIONS
+from utils.logger import setup_logger
+
+if TYPE_CHECKING:
+    # Sources and sinks import pandas and their loaders or writers when they are created,
+    # so building the CLI parser stays cheap
+    import pandas as pd
+    from writer.file_writer import PredictionFileWriter
+
+logger = setup_logger(__name__)
+
+# Source factories: (target, options) -> callable(transformer, chunk_size, key_columns) yielding DataFrames
+SOURCES: Dict[str, Callable] = {}
+# Sink factories: (target, options) -> object with write_predictions(df) and close()
+SINKS: Dict[str, Callable] = {}
+# "name:" prefix of a spec; a single letter is a drive (C:\out.csv), not a scheme
+SCHEME_PATTERN = re.compile(r'[A-Za-z][\w.+-]+')
+
+
+def register_source(name: str):
+    """
+    Register a source factory under a scheme name, e.g. @register_source('csv').
+
+    The factory is called as factory(target, options) and returns a callable
+    taking (transformer, chunk_size, key_columns) that yields DataFrames with
+    the key columns and the transformer's source columns.
+    """
+    def decorator(factory: Callable) -> Callable:
+        SOURCES[name] = factory
+        return factory
+    return decorator
+
+
+def register_sink(name: str):
+    """
+    Register a sink factory under a scheme name, e.g. @register_sink('csv').
+
+    The factory is called as factory(target, options) and returns an object with
+    write_predictions(df), receiving frames with id and predict_result columns,
+    and close().
+    """
+    def decorator(factory: Callable) -> Callable:
+        SINKS[name] = factory
+        return factory
+    return decorator
+
+
+def load_plugins(modules: Iterable[str]):
+    """Import modules that register additional sources or sinks."""
+    for module in modules:
+        importlib.import_module(module)
+        logger.info("Plugin loaded", extra={"plugin": module})
+
+
+def parse_spec(spec: str, registry: Dict[str, Callable]) -> Tuple[str, str]:
+    """
+    Split "scheme:target" into its parts.
+
+    A spec without a scheme is a path and the scheme comes from its extension:
+    parquet for .parquet/.pq, arrow for .arrow/.feather, csv otherwise. A "name:"
+    prefix is always a scheme, so a mistyped one is reported as unknown instead of
+    being written to a local file; a one-letter prefix is a Windows drive.
+
+    Args:
+        spec (str): E.g. "postgres:customer_data", "csv:out.csv" or "data.parquet"
+        registry (Dict[str, Callable]): SOURCES or SINKS
+
+    Returns:
+        Tuple[str, str]: The scheme and the target (may be empty)
+    """
+    scheme, separator, target = spec.partition(':')
+    if separator and scheme in registry:
+        return scheme, target
+    if spec in registry:
+        return spec, ''
+    if separator and SCHEME_PATTERN.fullmatch(scheme):
+        return scheme, target
+    suffix = Path(spec).suffix.lower()
+    if suffix in PARQUET_EXTENSIONS:
+        return 'parquet', spec
+    if suffix in ARROW_EXTENSIONS:
+        return 'arrow', spec
+    return 'csv', spec
+
+
+def create_source(spec: str, options: dict) -> Callable:
+    scheme, target = parse_spec(spec, SOURCES)
+    if scheme not in SOURCES:
+        raise ValueError(f"Unknown source {scheme!r}, expected one of: {', '.join(sorted(SOURCES))}")
+    return SOURCES[scheme](target, options)
+
+
+def create_sink(spec: str, options: dict):
+    scheme, target = parse_spec(spec, SINKS)
+    if scheme not in SINKS:
+        raise ValueError(f"Unknown sink {scheme!r}, expected one of: {', '.join(sorted(SINKS))}")
+    return SINKS[scheme](target, options)
+
+
+@register_source('csv')
+def csv_source(target: str, options: dict) -> Callable:
+    from load import CSVLoader
+    return CSVLoader(target, engine=options.get('csv_engine')).load_feature_chunks
+
+
+@register_source('parquet')
+def parquet_source(target: str, options: dict) -> Callable:
+    from load import ParquetLoader
+    return ParquetLoader(target).load_feature_chunks
+
+
+@register_source('postgres')
+def postgres_source(target: str, options: dict) -> Callable:
+    from load.db_loader import PostgresLoader
+    from utils.db import database_params_from_env
+    loader = PostgresLoader(**database_params_from_env())
+    return partial(loader.load_feature_chunks, table_name=target or 'customer_data')
+
+
+class DBSink:
+    """Writes predictions to a PostgreSQL table with COPY upserts, or DataFrame.to_sql appends."""
+
+    def __init__(self, table_name: str, mode: str = 'copy'):
+        from writer.db_writer import DBWriter
+        from utils.db import database_params_from_env
+        self.writer = DBWriter(**database_params_from_env())
+        self.table_name = table_name
+        self.mode = mode
+
+    def write_predictions(self, df: "pd.DataFrame"):
+        if self.mode == 'to_sql':
+            self.writer.write_predictions(df, self.table_name)
+        else:
+            self.writer.write_predictions_copy(df, self.table_name, upsert=True)
+
+    def close(self):
+        pass
+
+
+class CSVSink:
+    """
+    Appends predictions to a CSV file, writing the header with the first chunk.
+
+    Rows get the same prediction_date column as the database and Parquet/Arrow sinks.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = Path(file_path)
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._header = True
+
+    def write_predictions(self, df: "pd.DataFrame"):
+        frame = df[['id', 'predict_result']].assign(prediction_date=datetime.now().date())
+        frame.to_csv(self.file_path, mode='w' if self._header else 'a', header=self._header, index=False)
+        self._header = False
+
+    def close(self):
+        pass
+
+
+class NullSink:
+    """Discards predictions; for dry runs and measuring the pipeline without output."""
+
+    def write_predictions(self, df: "pd.DataFrame"):
+        pass
+
+    def close(self):
+        pass
+
+
+@register_sink('postgres')
+def postgres_sink(target: str, options: dict) -> DBSink:
+    return DBSink(target or 'prediction_results', options.get('db_write_mode', os.environ.get('DB_WRITE_MODE', 'copy')))
+
+
+@register_sink('parquet')
+@register_sink('arrow')
+def file_sink(target: str, options: dict) -> "PredictionFileWriter":
+    from writer.file_writer import PredictionFileWriter
+    return PredictionFileWriter(target)
+
+
+@register_sink('csv')
+def csv_sink(target: str, options: dict) -> CSVSink:
+    return CSVSink(target)
+
+
+@register_sink('null')
+def null_sink(target: str, options: dict) -> NullSink:
+    return NullSink()
@@ -0,0 +1,189 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, Iterator, List
+import numpy as np
+import pandas as pd
+from utils.logger import setup_logger
+from utils.profiling import profile_stage
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class _Stopped(Exception):
+    """Raised inside a stage when another stage failed."""
+
+
+class ChunkPipeline:
+    """
+    Load, score and write a stream of chunks with the three stages overlapping.
+
+    A loader thread reads chunk N+1 while the calling thread scores chunk N and
+    a writer thread writes chunk N-1, so database or file I/O runs alongside
+    the model. The queues between stages hold at most `prefetch` chunks each,
+    which bounds memory and applies backpressure: a slow sink stalls scoring,
+    which stalls loading. The first error in any stage stops the others and is
+    re-raised by run().
+    """
+
+    def __init__(self, score: Callable[[Iterable[pd.DataFrame]], Iterator[np.ndarray]], sinks: List,
+                 id_column: str = 'id', prefetch: int = 2):
+        """
+        Initialize the pipeline.
+
+        Args:
+            score (Callable): Takes an iterable of frames and yields their predictions in order,
+                e.g. ParallelScorer.score_frames
+            sinks (List): Objects with write_predictions(df) and close(); every chunk goes to each sink
+            id_column (str): Column of the loaded chunks written as the prediction id
+            prefetch (int): Chunks buffered between consecutive stages
+        """
+        self.logger = setup_logger(__name__)
+        self.score = score
+        self.sinks = sinks
+        self.id_column = id_column
+        self.prefetch = max(1, prefetch)
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def _fail(self, error: BaseException):
+        if not isinstance(error, _Stopped):
+            self._errors.append(error)
+        self._stop.set()
+
+    def _put(self, target: queue.Queue, item):
+        while True:
+            if self._stop.is_set() and item is not _DONE:
+                raise _Stopped()
+            try:
+                target.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    return
+
+    def _get(self, source: queue.Queue):
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _load(self, chunks: Iterable[pd.DataFrame], loaded: queue.Queue, stats: dict):
+        try:
+            iterator = iter(chunks)
+            for number in itertools.count(1):
+                started = time.perf_counter()
+                with profile_stage('load', log=False, chunk=number):
+                    chunk = next(iterator, _DONE)
+                stats['load_seconds'] += time.perf_counter() - started
+                if chunk is _DONE:
+                    break
+                self._put(loaded, chunk)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(loaded, _DONE)
+
+    def _write(self, scored: queue.Queue, stats: dict):
+        try:
+            while True:
+                item = self._get(scored)
+                if item is _DONE:
+                    return
+                ids, predictions = item
+                predictions_df = pd.DataFrame({'id': ids, 'predict_result': predictions})
+                started = time.perf_counter()
+                with profile_stage('write', log=False, rows=len(predictions_df)):
+                    for sink in self.sinks:
+                        sink.write_predictions(predictions_df)
+                stats['write_seconds'] += time.perf_counter() - started
+
+                stats['chunks'] += 1
+                stats['rows'] += len(predictions_df)
+                stats['churn_count'] += int(np.count_nonzero(predictions == 1))
+                self.logger.info("Chunk processed", extra={
+                    "chunk": stats['chunks'],
+                    "rows": len(predictions_df),
+                    "total_rows": stats['rows']
+                })
+        except BaseException as e:
+            self._fail(e)
+
+    def run(self, chunks: Iterable[pd.DataFrame]) -> dict:
+        """
+        Run the pipeline to completion and close the sinks.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Frames with the id column and the source columns
+
+        Returns:
+            dict: Rows, churn count and rate, wall seconds, rows per second, and the busy
+                seconds of each stage (their sum exceeds the wall time when stages overlap)
+
+        Raises:
+            Exception: The first error raised by any stage
+        """
+        stats = {'chunks': 0, 'rows': 0, 'churn_count': 0,
+                 'load_seconds': 0.0, 'score_seconds': 0.0, 'write_seconds': 0.0}
+        loaded, scored = queue.Queue(self.prefetch), queue.Queue(self.prefetch)
+        pending_ids = deque()
+        waiting = [0.0]
+
+        def frames():
+            # Feeds the scorer from the load queue; time blocked here is not scoring time
+            while True:
+                started = time.perf_counter()
+                chunk = self._get(loaded)
+                waiting[0] += time.perf_counter() - started
+                if chunk is _DONE:
+                    return
+                pending_ids.append(chunk[self.id_column].to_numpy())
+                yield chunk
+
+        started = time.perf_counter()
+        loader = threading.Thread(target=self._load, args=(chunks, loaded, stats), name="pipeline-load", daemon=True)
+        writer = threading.Thread(target=self._write, args=(scored, stats), name="pipeline-write", daemon=True)
+        loader.start()
+        writer.start()
+        try:
+            predictions_iter = iter(self.score(frames()))
+            while True:
+                step = time.perf_counter()
+                waiting[0] = 0.0
+                predictions = next(predictions_iter, _DONE)
+                stats['score_seconds'] += time.perf_counter() - step - waiting[0]
+                if predictions is _DONE:
+                    break
+                self._put(scored, (pending_ids.popleft(), np.asarray(predictions)))
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(scored, _DONE)
+            writer.join()
+            self._stop.set()
+            loader.join()
+            for sink in self.sinks:
+                try:
+                    sink.close()
+                except Exception as e:
+                    self._fail(e)
+
+        if self._errors:
+            raise self._errors[0]
+
+        seconds = time.perf_counter() - started
+        stats.update({
+            'churn_rate': round(stats['churn_count'] / stats['rows'] * 100, 2) if stats['rows'] else 0.0,
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(stats['rows'] / seconds, 1) if seconds > 0 else None,
+            'load_seconds': round(stats['load_seconds'], 3),
+            'score_seconds': round(stats['score_seconds'], 3),
+            'write_seconds': round(stats['write_seconds'], 3)
+        })
+        return stats
@@ -1,7 +1,93 @@
+import math
+import numpy as np
 import pandas as pd
-from typing import List, Optional
+from typing import Any, List, Optional
 from utils.logger import setup_logger
 
+CONTRACT_COLUMNS = ['Month-to-month', 'One year', 'Two year']
+# Raw input columns the features are derived from
+SOURCE_COLUMNS = ['TotalCharges', 'Contract', 'PhoneService', 'tenure']
+# dtypes loaders can read the source columns as; TotalCharges stays untyped because exports contain blanks
+SOURCE_DTYPES = {'Contract': 'category', 'PhoneService': 'category', 'tenure': 'float64'}
+PHONE_SERVICE_MAP = {'Yes': 1, 'No': 0}
+TOTAL_CHARGES_FILL = 2279  # 2279 is mean value in data
+
+
+def _field(record: Any, name: str):
+    """Read a field from a dict or an object such as CustomerData."""
+    if isinstance(record, dict):
+        return record[name]
+    return getattr(record, name)
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class RecordEncoder:
+    """
+    Pandas-free encoder for a single customer record.
+
+    Produces the same values as DataTransformer.transform followed by
+    get_features_for_prediction for a one-row frame, in the order of the
+    given result columns. The column layout is resolved once at construction
+    so encoding a record is a handful of dict lookups.
+    """
+
+    def __init__(self, result_columns: List[str]):
+        self.result_columns = list(result_columns)
+        self.width = len(self.result_columns)
+        self.total_charges_index = self.result_columns.index('TotalCharges')
+        self.phone_service_index = self.result_columns.index('PhoneService')
+        self.tenure_index = self.result_columns.index('tenure')
+        self.contract_index = {
+            contract: self.result_columns.index(contract) for contract in CONTRACT_COLUMNS
+        }
+
+    @staticmethod
+    def encode_total_charges(value) -> float:
+        # Mirrors fillna(2279) followed by astype(str).str.replace(' ', '2279').astype(float)
+        if _is_missing(value):
+            return float(TOTAL_CHARGES_FILL)
+        if isinstance(value, str):
+            return float(value.replace(' ', str(TOTAL_CHARGES_FILL)))
+        return float(value)
+
+    @staticmethod
+    def encode_phone_service(value) -> float:
+        # Mirrors fillna('No') followed by map({'Yes': 1, 'No': 0}); unknown values become NaN
+        if _is_missing(value):
+            value = 'No'
+        return float(PHONE_SERVICE_MAP.get(value, np.nan))
+
+    @staticmethod
+    def encode_tenure(value) -> float:
+        # The mean of a single missing value is NaN, so a missing tenure stays NaN
+        if _is_missing(value):
+            return np.nan
+        return float(value)
+
+    def __call__(self, record: Any) -> np.ndarray:
+        """
+        Encode a single record.
+
+        Args:
+            record (Any): A dict or an object (e.g. CustomerData) with TotalCharges,
+                Contract, PhoneService and tenure
+
+        Returns:
+            np.ndarray: Array of shape (1, len(result_columns)) in result_columns order
+        """
+        row = np.zeros((1, self.width), dtype=np.float64)
+        row[0, self.total_charges_index] = self.encode_total_charges(_field(record, 'TotalCharges'))
+        contract_index = self.contract_index.get(_field(record, 'Contract'))
+        if contract_index is not None:
+            row[0, contract_index] = 1.0
+        row[0, self.phone_service_index] = self.encode_phone_service(_field(record, 'PhoneService'))
+        row[0, self.tenure_index] = self.encode_tenure(_field(record, 'tenure'))
+        return row
+
+
 class DataTransformer:
     """
     A class to handle data preprocessing for the churn prediction model.
@@ -18,6 +104,9 @@ class DataTransformer:
             'PhoneService',
             'tenure'
         ]
+        self.source_columns = list(SOURCE_COLUMNS)
+        self.source_dtypes = dict(SOURCE_DTYPES)
+        self.record_encoder = RecordEncoder(self.result_columns)
         self.logger.info("DataTransformer initialized", extra={
             "result_columns": self.result_columns
         })
@@ -40,8 +129,8 @@ class DataTransformer:
             
             # Handle missing values
             self.logger.info("Handling missing values in TotalCharges")
-            dataset['TotalCharges'] = dataset['TotalCharges'].fillna(2279)  # 2279 is mean value in data
-            dataset['TotalCharges'] = dataset['TotalCharges'].astype(str).str.replace(' ', '2279')
+            dataset['TotalCharges'] = dataset['TotalCharges'].fillna(TOTAL_CHARGES_FILL)
+            dataset['TotalCharges'] = dataset['TotalCharges'].astype(str).str.replace(' ', str(TOTAL_CHARGES_FILL))
             dataset['TotalCharges'] = dataset['TotalCharges'].astype(float)
             
             # Drop nulls in Contract as it's an important feature
@@ -58,15 +147,14 @@ class DataTransformer:
             
             # Feature handling
             self.logger.info("Converting PhoneService to binary")
-            dataset['PhoneService'] = dataset['PhoneService'].map({'Yes': 1, 'No': 0})
+            dataset['PhoneService'] = dataset['PhoneService'].map(PHONE_SERVICE_MAP)
             
             # Create dummy variables for Contract
             self.logger.info("Creating dummy variables for Contract")
             contract_dummies = pd.get_dummies(dataset['Contract']).astype(int)
             
             # Ensure all required contract columns exist
-            required_contracts = ['Month-to-month', 'One year', 'Two year']
-            for contract in required_contracts:
+            for contract in CONTRACT_COLUMNS:
                 if contract not in contract_dummies.columns:
                     self.logger.info(f"Adding missing contract column: {contract}")
                     contract_dummies[contract] = 0
@@ -119,4 +207,80 @@ class DataTransformer:
                 "input_shape": dataset.shape,
                 "required_features": self.result_columns
             }, exc_info=True)
-            raise 
\ No newline at end of file
+            raise 
+
+    def transform_batch(self, dataset: pd.DataFrame) -> np.ndarray:
+        """
+        Vectorized transform of a whole frame straight into the feature matrix.
+        
+        Only the source columns are read and the input frame is left untouched.
+        TotalCharges is parsed with pd.to_numeric, so blank strings (and any other
+        unparsable value) get the fill value; Contract is one-hot encoded from
+        categorical codes into a preallocated float32 matrix. For the Telco data
+        the result equals transform() followed by get_features_for_prediction(),
+        cast to float32 (the precision the model predicts at).
+        
+        Args:
+            dataset (pd.DataFrame): Input dataset with at least the source columns
+            
+        Returns:
+            np.ndarray: float32 matrix of shape (rows, len(result_columns)) in result_columns order
+        """
+        try:
+            self.logger.info("Starting batch transformation", extra={
+                "input_shape": dataset.shape
+            })
+            
+            features = np.zeros((len(dataset), len(self.result_columns)), dtype=np.float32)
+            
+            total_charges = pd.to_numeric(dataset['TotalCharges'], errors='coerce')
+            features[:, self.record_encoder.total_charges_index] = total_charges.fillna(TOTAL_CHARGES_FILL).to_numpy()
+            
+            codes = pd.Categorical(dataset['Contract'], categories=CONTRACT_COLUMNS).codes
+            known = codes >= 0
+            contract_columns = np.array([self.record_encoder.contract_index[c] for c in CONTRACT_COLUMNS])
+            features[np.flatnonzero(known), contract_columns[codes[known]]] = 1
+            
+            # Missing PhoneService counts as 'No'; unknown values become NaN like map() does
+            phone_service = dataset['PhoneService']
+            phone_codes = pd.Categorical(phone_service, categories=['No', 'Yes']).codes
+            phone_values = phone_codes.astype(np.float32)
+            phone_values[phone_codes < 0] = np.where(phone_service.isna().to_numpy()[phone_codes < 0], 0.0, np.nan)
+            features[:, self.record_encoder.phone_service_index] = phone_values
+            
+            tenure = pd.to_numeric(dataset['tenure'])
+            features[:, self.record_encoder.tenure_index] = tenure.fillna(tenure.mean()).to_numpy()
+            
+            self.logger.info("Batch transformation completed", extra={
+                "output_shape": features.shape
+            })
+            
+            return features
+            
+        except Exception as e:
+            self.logger.error("Error during batch transformation", extra={
+                "error": str(e),
+                "input_shape": dataset.shape
+            }, exc_info=True)
+            raise
+    
+    def transform_record(self, record: Any) -> np.ndarray:
+        """
+        Transform a single record straight into a feature row, without pandas.
+
+        This is the fast path for single-record inference and gives the same
+        values as transform() followed by get_features_for_prediction().
+
+        Args:
+            record (Any): A dict or a CustomerData instance
+
+        Returns:
+            np.ndarray: Feature row of shape (1, len(result_columns))
+        """
+        try:
+            return self.record_encoder(record)
+        except Exception as e:
+            self.logger.error("Error during record transformation", extra={
+                "error": str(e)
+            }, exc_info=True)
+            raise
@@ -0,0 +1,115 @@
+import atexit
+import multiprocessing.util
+import os
+import threading
+from typing import Dict
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from utils.logger import setup_logger
+
+# Connection pool settings shared by every engine in the process
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+# Seconds after which a pooled connection is replaced; -1 keeps connections indefinitely
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+# Test each connection with a lightweight ping when it is checked out of the pool
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') not in ('0', 'false', 'False')
+# Server-side statement timeout in milliseconds; 0 disables it
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+
+logger = setup_logger(__name__)
+
+_engines: Dict[str, Engine] = {}
+_lock = threading.Lock()
+
+
+def database_params_from_env() -> dict:
+    """
+    Connection parameters from the DATABASE_* environment variables.
+
+    Returns:
+        dict: host, port, database, user and password, usable as PostgresLoader/DBWriter keyword arguments
+    """
+    return {
+        'host': os.environ.get('DATABASE_HOST', 'localhost'),
+        'port': os.environ.get('DATABASE_PORT', '5432'),
+        'database': os.environ.get('DATABASE_NAME', 'mlops_db'),
+        'user': os.environ.get('DATABASE_USER', 'mlops'),
+        'password': os.environ.get('DATABASE_PASSWORD', 'mlops')
+    }
+
+
+def get_engine(host: str, port: int, database: str, user: str, password: str) -> Engine:
+    """
+    Return the process-wide engine for a database, creating it on first use.
+
+    Every loader and writer pointing at the same database shares one engine and
+    therefore one connection pool.
+
+    Args:
+        host (str): Database host
+        port (int): Database port
+        database (str): Database name
+        user (str): Database user
+        password (str): Database password
+
+    Returns:
+        Engine: The shared SQLAlchemy engine
+    """
+    url = f"postgresql://{user}:{password}@{host}:{port}/{database}"
+    with _lock:
+        engine = _engines.get(url)
+        if engine is None:
+            connect_args = {}
+            if DB_STATEMENT_TIMEOUT_MS > 0:
+                connect_args['options'] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+            engine = create_engine(
+                url,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+                pool_pre_ping=DB_POOL_PRE_PING,
+                connect_args=connect_args
+            )
+            _engines[url] = engine
+            logger.info("Database engine created", extra={
+                "host": host,
+                "port": port,
+                "database": database,
+                "pool_size": DB_POOL_SIZE,
+                "max_overflow": DB_MAX_OVERFLOW,
+                "pool_recycle": DB_POOL_RECYCLE,
+                "pool_pre_ping": DB_POOL_PRE_PING,
+                "statement_timeout_ms": DB_STATEMENT_TIMEOUT_MS
+            })
+    return engine
+
+
+def dispose_engines():
+    """Close every pooled connection and forget the engines; called at the end of a run and at exit."""
+    with _lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.dispose()
+    if engines:
+        logger.info("Database engines disposed", extra={"engines": len(engines)})
+
+
+def _forget_engines_after_fork():
+    # A forked child must not use the parent's pooled sockets; drop them without closing
+    global _lock
+    _lock = threading.Lock()
+    for engine in _engines.values():
+        engine.dispose(close=False)
+    _engines.clear()
+
+
+atexit.register(dispose_engines)
+os.register_at_fork(after_in_child=_forget_engines_after_fork)
+# multiprocessing children skip atexit; dispose there before logging shuts down (exitpriority 10)
+multiprocessing.util.register_after_fork(
+    dispose_engines, lambda func: multiprocessing.util.Finalize(None, func, exitpriority=20)
+)
@@ -1,8 +1,37 @@
+import atexit
+import copy
 import logging
+import logging.handlers
 import json
+import multiprocessing.util
 import os
+import queue
+import random
+import threading
+from contextvars import ContextVar
 from datetime import datetime
 
+LOG_DIR = 'logs'
+# Maximum number of records waiting to be written; further records are dropped and counted
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+# Default level for all application loggers
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+# Per-logger overrides, e.g. "model.predictor=WARNING,transform.data_transformer=WARNING"
+LOG_LEVELS = {
+    name.strip(): level.strip().upper()
+    for name, _, level in (
+        item.partition('=') for item in os.environ.get('LOG_LEVELS', '').split(',') if '=' in item
+    )
+}
+# Fraction of requests whose detailed INFO events are kept; summaries, warnings and errors are always kept
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+
+# Event name that marks the one-per-request summary record, which is never sampled out
+SUMMARY_EVENT = 'request_summary'
+
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_ATTRIBUTES = set(logging.LogRecord('', 0, '', 0, '', None, None).__dict__) | {'message', 'asctime', 'taskName'}
+
 class JSONFormatter(logging.Formatter):
     def format(self, record):
         log_record = {
@@ -12,37 +41,178 @@ class JSONFormatter(logging.Formatter):
             "module": record.module,
             "function": record.funcName
         }
-        if hasattr(record, 'extra'):
-            log_record.update(record.extra)
-        return json.dumps(log_record)
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                log_record[key] = value
+        return json.dumps(log_record, default=str)
+
+_request_sampled: ContextVar[bool] = ContextVar('log_request_sampled', default=True)
+
+def sample_request() -> bool:
+    """
+    Decide whether the current request keeps its detailed INFO events.
+
+    Call once at the start of a request; the decision applies to every record
+    logged from the same context until the next call.
+
+    Returns:
+        bool: True if the request's INFO events will be logged
+    """
+    sampled = LOG_SAMPLE_RATE >= 1.0 or random.random() < LOG_SAMPLE_RATE
+    _request_sampled.set(sampled)
+    return sampled
+
+class SamplingFilter(logging.Filter):
+    """
+    Drops INFO (and lower) records of requests that were not sampled, except request summaries.
+    """
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+        if getattr(record, 'event', None) == SUMMARY_EVENT:
+            return True
+        return _request_sampled.get()
+
+class DailyFileHandler(logging.FileHandler):
+    """
+    File handler writing to logs/app_YYYYMMDD.log that switches to a new file when the date changes.
+    """
+
+    def __init__(self, log_dir: str):
+        self.log_dir = log_dir
+        self.current_date = datetime.now().strftime("%Y%m%d")
+        super().__init__(self._path(self.current_date))
+
+    def _path(self, date: str) -> str:
+        return os.path.join(self.log_dir, f'app_{date}.log')
+
+    def emit(self, record):
+        date = datetime.now().strftime("%Y%m%d")
+        if date != self.current_date:
+            self.acquire()
+            try:
+                if self.stream:
+                    self.stream.close()
+                    self.stream = None
+                self.current_date = date
+                self.baseFilename = os.path.abspath(self._path(date))
+            finally:
+                self.release()
+        super().emit(record)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the caller: when the bounded queue is full the record is dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Only resolve the message here; JSON encoding happens on the listener thread.
+        # The queue is in-process, so exc_info can travel with the record as is.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_lock = threading.Lock()
+_queue_handler = None
+_listener = None
+
+def _start_listener():
+    global _queue_handler, _listener
+    if not os.path.exists(LOG_DIR):
+        os.makedirs(LOG_DIR)
+
+    file_handler = DailyFileHandler(LOG_DIR)
+    file_handler.setFormatter(JSONFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(JSONFormatter())
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    if _queue_handler is None:
+        _queue_handler = DroppingQueueHandler(log_queue)
+        _queue_handler.addFilter(SamplingFilter())
+    else:
+        _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+    _listener.start()
+
+def _reset_after_fork():
+    # The listener thread does not survive fork; give the child its own queue and listener
+    global _listener, _lock
+    _lock = threading.Lock()
+    if _listener is not None:
+        _listener = None
+        _queue_handler.dropped = 0
+        _start_listener()
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the background listener.
+    """
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        if _queue_handler.dropped:
+            _listener.queue.put(logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                f"{_queue_handler.dropped} log records dropped because the log queue was full",
+                None, None, func='shutdown_logging'
+            ))
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def dropped_records() -> int:
+    """
+    Number of log records dropped because the log queue was full.
+    """
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=_reset_after_fork)
+# multiprocessing children leave through os._exit and skip atexit; their finalizers are
+# registered after multiprocessing clears the ones inherited from the parent
+multiprocessing.util.register_after_fork(
+    shutdown_logging, lambda func: multiprocessing.util.Finalize(None, func, exitpriority=10)
+)
 
 def setup_logger(name):
     """
     Set up and return a logger with JSON formatting for both file and console output.
-    
+
+    Records go through a bounded in-memory queue and are formatted and written by a
+    background listener, so logging never does I/O on the calling thread. Calling
+    this more than once for the same name returns the same logger without adding
+    handlers again.
+
     Args:
         name (str): The name of the logger (typically __name__)
-        
+
     Returns:
         logging.Logger: Configured logger instance
     """
-    # Configure logging directory
-    log_dir = 'logs'
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    with _lock:
+        if _listener is None:
+            _start_listener()
 
     # Get logger
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-
-    # Add file handler
-    file_handler = logging.FileHandler(os.path.join(log_dir, f'app_{datetime.now().strftime("%Y%m%d")}.log'))
-    file_handler.setFormatter(JSONFormatter())
-    logger.addHandler(file_handler)
+    logger.setLevel(LOG_LEVELS.get(name, LOG_LEVEL))
 
-    # Add console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(JSONFormatter())
-    logger.addHandler(console_handler)
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
 
-    return logger 
\ No newline at end of file
+    return logger
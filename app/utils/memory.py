@@ -0,0 +1,84 @@
+import os
+import resource
+import sys
+from typing import Optional
+
+# smaps_rollup fields reported, in kB
+_SMAPS_FIELDS = {
+    'Rss': 'rss_mb',
+    'Pss': 'pss_mb',
+    'Shared_Clean': 'shared_clean_mb',
+    'Shared_Dirty': 'shared_dirty_mb',
+    'Private_Clean': 'private_clean_mb',
+    'Private_Dirty': 'private_dirty_mb',
+}
+
+
+def process_memory(pid: Optional[int] = None) -> dict:
+    """
+    Resident memory of a process, split into shared and private pages.
+
+    On Linux the numbers come from /proc/<pid>/smaps_rollup: shared_mb is memory
+    also mapped by other processes (e.g. copy-on-write pages inherited from a
+    pre-fork master), private_mb is memory only this process uses and pss_mb
+    charges shared pages proportionally, so the PSS of all workers adds up to
+    their real footprint. Elsewhere only the peak RSS of the current process is
+    available.
+
+    Args:
+        pid (Optional[int]): Process id (default: the current process)
+
+    Returns:
+        dict: Memory figures in MB
+    """
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    try:
+        with open(path) as f:
+            values = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].rstrip(':') in _SMAPS_FIELDS:
+                    values[_SMAPS_FIELDS[parts[0].rstrip(':')]] = round(int(parts[1]) / 1024, 1)
+    except OSError:
+        if pid is not None and pid != os.getpid():
+            return {}
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kB elsewhere
+        return {'peak_rss_mb': round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)}
+
+    values['shared_mb'] = round(values.get('shared_clean_mb', 0) + values.get('shared_dirty_mb', 0), 1)
+    values['private_mb'] = round(values.get('private_clean_mb', 0) + values.get('private_dirty_mb', 0), 1)
+    return values
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak RSS of the current process, so peak_rss_mb() covers only what runs afterwards.
+
+    Returns:
+        bool: False where the kernel does not support it (peak_rss_mb() then reports the process lifetime peak)
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident memory of the current process in MB, since start or the last reset_peak_rss().
+
+    Returns:
+        float: Peak RSS in MB
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
@@ -0,0 +1,256 @@
+import contextlib
+import cProfile
+import itertools
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from typing import FrozenSet, Iterable, Iterator, Optional
+from utils.logger import LOG_DIR, setup_logger
+
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+
+
+def parse_modes(value: Optional[str]) -> FrozenSet[str]:
+    """
+    Parse a profiling switch such as "cprofile", "tracemalloc", "cprofile,tracemalloc", "all" or "1".
+
+    Args:
+        value (Optional[str]): The switch value; empty, "0" and "off" disable profiling
+
+    Returns:
+        FrozenSet[str]: The enabled capture modes
+    """
+    items = {item.strip().lower() for item in (value or '').split(',') if item.strip()}
+    if items & {'1', 'all', 'true', 'yes'}:
+        return frozenset(PROFILE_MODES)
+    return frozenset(items & set(PROFILE_MODES))
+
+
+# Capture modes applied to every stage of the process (batch runs); empty only records timing spans
+PROFILE = parse_modes(os.environ.get('PROFILE'))
+# Directory receiving one JSON report (and a pstats .prof file) per profiled stage
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(LOG_DIR, 'profiles'))
+# Functions and allocation sites kept per report
+PROFILE_TOP = int(os.environ.get('PROFILE_TOP', 30))
+# API: fraction of requests profiled, and whether clients may ask for it with the X-Profile header
+PROFILE_REQUEST_RATE = float(os.environ.get('PROFILE_REQUEST_RATE', 0))
+PROFILE_REQUESTS = os.environ.get('PROFILE_REQUESTS', '0') in ('1', 'true', 'True')
+
+logger = setup_logger(__name__)
+
+
+class _ProfileRun:
+    """Reports of one batch run or one API request, numbered in the order their stages finish."""
+
+    def __init__(self, run_id: str, modes: FrozenSet[str]):
+        self.run_id = run_id
+        self.modes = modes
+        self._sequence = itertools.count(1)
+
+    def next_path(self, stage: str) -> str:
+        directory = os.path.join(PROFILE_DIR, self.run_id)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{next(self._sequence):03d}_{stage}")
+
+
+_request_run: ContextVar[Optional[_ProfileRun]] = ContextVar('profile_request_run', default=None)
+_process_runs = {}
+_process_lock = threading.Lock()
+# cProfile profiles one thread; nested stages are timed but only the outermost one is captured
+_local = threading.local()
+# tracemalloc is process-wide; it runs while any stage in any thread captures allocations
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+def _new_run_id(prefix: str = '') -> str:
+    return f"{prefix}{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{uuid.uuid4().hex[:6]}"
+
+
+def _current_run() -> Optional[_ProfileRun]:
+    run = _request_run.get()
+    if run is not None or not PROFILE:
+        return run
+    # One run per process, so forked scoring workers write their own reports
+    pid = os.getpid()
+    with _process_lock:
+        if pid not in _process_runs:
+            _process_runs[pid] = _ProfileRun(_new_run_id(), PROFILE)
+        return _process_runs[pid]
+
+
+def sample_profile(requested: Optional[str] = None) -> Optional[str]:
+    """
+    Decide whether the current API request is profiled.
+
+    Call once at the start of a request, like sample_request(); stages entered
+    from the same context (or a copy of it) are then captured. A request is
+    profiled when the client sent an X-Profile header and PROFILE_REQUESTS is
+    enabled, or at random with probability PROFILE_REQUEST_RATE.
+
+    Args:
+        requested (Optional[str]): Value of the X-Profile header, e.g. "1" or "cprofile"
+
+    Returns:
+        Optional[str]: The run id the request's reports are written under, or None
+    """
+    modes = parse_modes(requested) if PROFILE_REQUESTS else frozenset()
+    if not modes and PROFILE_REQUEST_RATE > 0 and random.random() < PROFILE_REQUEST_RATE:
+        modes = PROFILE or frozenset(PROFILE_MODES)
+    run = _ProfileRun(_new_run_id('request_'), modes) if modes else None
+    _request_run.set(run)
+    return run.run_id if run else None
+
+
+def _start_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+        tracemalloc.reset_peak()
+        return tracemalloc.take_snapshot()
+
+
+def _stop_tracing(before) -> dict:
+    global _tracing_users
+    with _tracing_lock:
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
+    differences = after.compare_to(before, 'lineno')
+    return {
+        'peak_mb': round(peak / (1024 * 1024), 3),
+        'net_mb': round(sum(diff.size_diff for diff in differences) / (1024 * 1024), 3),
+        'top': [
+            {
+                'location': f"{diff.traceback[0].filename}:{diff.traceback[0].lineno}",
+                'size_kb': round(diff.size_diff / 1024, 1),
+                'count': diff.count_diff
+            }
+            for diff in differences[:PROFILE_TOP]
+        ]
+    }
+
+
+def _profile_summary(profiler: cProfile.Profile, path: str) -> dict:
+    profiler.dump_stats(path + '.prof')
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+    return {
+        'total_calls': stats.total_calls,
+        'primitive_calls': stats.prim_calls,
+        'total_seconds': round(stats.total_tt, 6),
+        'stats_file': os.path.basename(path) + '.prof',
+        'top': [
+            {
+                'function': f"{filename}:{line}({function})",
+                'calls': calls,
+                'primitive_calls': primitive,
+                'tottime': round(tottime, 6),
+                'cumtime': round(cumtime, 6)
+            }
+            for (filename, line, function), (primitive, calls, tottime, cumtime, _) in rows
+        ]
+    }
+
+
+@contextlib.contextmanager
+def profile_stage(stage: str, log: bool = True, **fields):
+    """
+    Timing span around one pipeline stage, with optional cProfile/tracemalloc capture.
+
+    The span is always timed, and logged unless log=False. When the process (PROFILE) or the
+    current request (sample_profile) enables capture, the stage's cProfile
+    stats and its top allocation sites are written as JSON to PROFILE_DIR.
+
+    Args:
+        stage (str): Stage name, e.g. load, transform, predict or write
+        log (bool): Log spans that are not captured (captured spans are always logged)
+        **fields: Extra fields for the log event and the report, e.g. rows
+    """
+    run = _current_run()
+    capture = run is not None and not getattr(_local, 'capturing', False)
+    profiler = before = started_at = None
+    if capture:
+        _local.capturing = True
+        started_at = datetime.now().isoformat()
+        if 'tracemalloc' in run.modes:
+            before = _start_tracing()
+        if 'cprofile' in run.modes:
+            profiler = cProfile.Profile()
+            profiler.enable()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        report_path = None
+        if capture:
+            if profiler is not None:
+                profiler.disable()
+            _local.capturing = False
+            memory = _stop_tracing(before) if before is not None else None
+            try:
+                report_path = _write_report(run, stage, started_at, duration_ms, fields, profiler, memory)
+            except Exception as e:
+                logger.warning("Could not write profile report", extra={"stage": stage, "error": str(e)})
+        if log or capture:
+            logger.info("Stage completed", extra={
+                "stage": stage,
+                "duration_ms": duration_ms,
+                **fields,
+                **({"profile_report": report_path} if report_path else {})
+            })
+
+
+def _write_report(run: _ProfileRun, stage: str, started_at: str, duration_ms: float, fields: dict,
+                  profiler: Optional[cProfile.Profile], memory: Optional[dict]) -> str:
+    path = run.next_path(stage)
+    report = {
+        'run_id': run.run_id,
+        'stage': stage,
+        'pid': os.getpid(),
+        'thread': threading.current_thread().name,
+        'started_at': started_at,
+        'duration_ms': duration_ms,
+        **fields
+    }
+    if memory is not None:
+        report['tracemalloc'] = memory
+    if profiler is not None:
+        report['cprofile'] = _profile_summary(profiler, path)
+    with open(path + '.json', 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    return path + '.json'
+
+
+def profile_iter(iterable: Iterable, stage: str) -> Iterator:
+    """
+    Yield from an iterable, wrapping the production of each item in a stage span.
+
+    Used for chunked loads, where the work happens inside next().
+
+    Args:
+        iterable (Iterable): E.g. the chunks of load_data_in_chunks
+        stage (str): Stage name for every item
+    """
+    iterator = iter(iterable)
+    for number in itertools.count(1):
+        with profile_stage(stage, chunk=number):
+            item = next(iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+
+_DONE = object()
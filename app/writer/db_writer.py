@@ -1,8 +1,10 @@
+import io
 import pandas as pd
-from sqlalchemy import create_engine, text
-from typing import Optional
+from sqlalchemy import text
+from typing import List, Optional
 from datetime import datetime
 from utils.logger import setup_logger
+from utils.db import get_engine
 
 class DBWriter:
     """
@@ -21,13 +23,39 @@ class DBWriter:
             password (str): Database password
         """
         self.logger = setup_logger(__name__)
-        self.connection_string = f"postgresql://{user}:{password}@{host}:{port}/{database}"
-        self.engine = create_engine(self.connection_string)
+        # Engines are shared per database, so loaders and writers reuse one connection pool
+        self.engine = get_engine(host, port, database, user, password)
+        self._created_tables = set()
         self.logger.info("DBWriter initialized", extra={
             "host": host,
             "database": database
         })
         
+    def ensure_table(self, table_name: str = 'prediction_results') -> None:
+        """
+        Create the predictions table if it doesn't exist.
+        
+        The check runs once per table for the lifetime of the writer, not on every write.
+        
+        Args:
+            table_name (str): Name of the table to create (default: 'prediction_results')
+        """
+        if table_name in self._created_tables:
+            return
+        
+        create_table_query = f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            id INTEGER PRIMARY KEY,
+            predict_result INTEGER,
+            prediction_date DATE
+        )
+        """
+        
+        with self.engine.connect() as connection:
+            connection.execute(text(create_table_query))
+            connection.commit()
+        self._created_tables.add(table_name)
+        
     def write_predictions(self, df: pd.DataFrame, table_name: str = 'prediction_results') -> None:
         """
         Write prediction results to the database.
@@ -51,20 +79,10 @@ class DBWriter:
                 raise ValueError(f"DataFrame must contain columns: {required_columns}")
             
             # Create table if it doesn't exist
-            create_table_query = f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                id INTEGER PRIMARY KEY,
-                predict_result INTEGER,
-                prediction_date DATE
-            )
-            """
+            self.ensure_table(table_name)
             
-            with self.engine.connect() as connection:
-                connection.execute(text(create_table_query))
-                connection.commit()
-            
-            # Add today's date to the DataFrame
-            df['prediction_date'] = datetime.now().date()
+            # Add today's date without touching the caller's frame, which other sinks may also write
+            df = df.assign(prediction_date=datetime.now().date())
             
             # Write the DataFrame to the database
             df.to_sql(
@@ -81,4 +99,154 @@ class DBWriter:
                 "error": str(e),
                 "table": table_name
             }, exc_info=True)
-            raise Exception(f"Error writing predictions to PostgreSQL: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Error writing predictions to PostgreSQL: {str(e)}") 
+
+    def write_predictions_copy(self, df: pd.DataFrame, table_name: str = 'prediction_results', upsert: bool = True) -> None:
+        """
+        Bulk-write prediction results with PostgreSQL COPY FROM STDIN.
+        
+        The frame is serialized to an in-memory CSV buffer and streamed through
+        psycopg2's copy_expert, avoiding per-row INSERT statements. With upsert
+        enabled, rows are first copied into a temporary staging table (temporary
+        tables are not WAL-logged) and then merged with INSERT ... ON CONFLICT (id)
+        DO UPDATE, so re-running a job overwrites earlier results instead of
+        failing on the primary key.
+        
+        Args:
+            df (pd.DataFrame): DataFrame containing prediction results with columns ['id', 'predict_result']
+            table_name (str): Name of the table to write to (default: 'prediction_results')
+            upsert (bool): Update existing rows with the same id instead of failing (default: True)
+            
+        Raises:
+            Exception: If there's an error connecting to the database or writing the data
+        """
+        try:
+            self.logger.info("Bulk writing predictions to database", extra={
+                "table": table_name,
+                "rows": len(df),
+                "upsert": upsert
+            })
+            
+            # Ensure the DataFrame has the required columns
+            required_columns = ['id', 'predict_result']
+            if not all(col in df.columns for col in required_columns):
+                raise ValueError(f"DataFrame must contain columns: {required_columns}")
+            
+            self.ensure_table(table_name)
+            
+            # Serialize without touching the caller's frame
+            frame = df[required_columns].assign(prediction_date=datetime.now().date())
+            self._copy_frame(frame, table_name, ['predict_result', 'prediction_date'] if upsert else None)
+            
+            self.logger.info("Predictions written successfully", extra={"rows": len(df)})
+            
+        except Exception as e:
+            self.logger.error("Error bulk writing predictions", extra={
+                "error": str(e),
+                "table": table_name
+            }, exc_info=True)
+            raise Exception(f"Error writing predictions to PostgreSQL: {str(e)}")
+
+    def _copy_frame(self, frame: pd.DataFrame, table_name: str, update_columns: Optional[List[str]] = None) -> None:
+        """
+        COPY a frame into table_name, upserting on id when update_columns is given.
+        
+        The upsert copies into a temporary staging table (temporary tables are not
+        WAL-logged) and merges it with INSERT ... ON CONFLICT (id) DO UPDATE.
+        ON CONFLICT cannot update a row twice in one statement, so only the last
+        row per id is upserted. The table is written in a single transaction.
+        """
+        if update_columns:
+            frame = frame.drop_duplicates('id', keep='last')
+        columns = ', '.join(frame.columns)
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        
+        connection = self.engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                if update_columns:
+                    staging_table = f"{table_name}_staging"
+                    cursor.execute(
+                        f"CREATE TEMP TABLE IF NOT EXISTS {staging_table} "
+                        f"(LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+                    )
+                    cursor.copy_expert(f"COPY {staging_table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+                    updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in update_columns)
+                    cursor.execute(f"""
+                        INSERT INTO {table_name} ({columns})
+                        SELECT {columns} FROM {staging_table}
+                        ON CONFLICT (id) DO UPDATE SET {updates}
+                    """)
+                else:
+                    cursor.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    def ensure_state_table(self, table_name: str = 'scoring_state') -> None:
+        """
+        Create the incremental scoring state table if it doesn't exist.
+        
+        It holds, per customer id, the hash of the scored feature columns and the
+        model version that scored them.
+        
+        Args:
+            table_name (str): Name of the table to create (default: 'scoring_state')
+        """
+        if table_name in self._created_tables:
+            return
+        
+        create_table_query = f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            id BIGINT PRIMARY KEY,
+            row_hash TEXT NOT NULL,
+            model_version TEXT,
+            scored_at TIMESTAMP
+        )
+        """
+        
+        with self.engine.connect() as connection:
+            connection.execute(text(create_table_query))
+            connection.commit()
+        self._created_tables.add(table_name)
+
+    def write_scoring_state(self, df: pd.DataFrame, model_version: Optional[str], table_name: str = 'scoring_state') -> None:
+        """
+        Record which rows were scored, with their row hash and the model version.
+        
+        Call it after the predictions are written: if the job stops in between, the
+        rows are simply scored again on the next run.
+        
+        Args:
+            df (pd.DataFrame): DataFrame with columns ['id', 'row_hash']
+            model_version (Optional[str]): Version of the model that scored the rows
+            table_name (str): Name of the state table (default: 'scoring_state')
+            
+        Raises:
+            Exception: If there's an error connecting to the database or writing the data
+        """
+        try:
+            required_columns = ['id', 'row_hash']
+            if not all(col in df.columns for col in required_columns):
+                raise ValueError(f"DataFrame must contain columns: {required_columns}")
+            
+            self.ensure_state_table(table_name)
+            frame = df[required_columns].assign(model_version=model_version, scored_at=datetime.now())
+            self._copy_frame(frame, table_name, ['row_hash', 'model_version', 'scored_at'])
+            
+            self.logger.info("Scoring state written successfully", extra={
+                "table": table_name,
+                "rows": len(df)
+            })
+            
+        except Exception as e:
+            self.logger.error("Error writing scoring state", extra={
+                "error": str(e),
+                "table": table_name
+            }, exc_info=True)
+            raise Exception(f"Error writing scoring state to PostgreSQL: {str(e)}")
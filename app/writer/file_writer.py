@@ -0,0 +1,119 @@
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+from utils.logger import setup_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# File extensions written as Parquet; .arrow and .feather are written as Arrow IPC files
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.arrow', '.feather')
+
+
+class PredictionFileWriter:
+    """
+    Writer class for writing prediction results to a columnar file.
+
+    The format is chosen from the file extension: Parquet for .parquet/.pq and
+    Arrow IPC for .arrow/.feather. The file has the same columns as the
+    prediction_results table. Each call to write_predictions appends one row
+    group (Parquet) or record batch (Arrow), so chunked jobs can stream their
+    output; call close() (or use the writer as a context manager) to finish
+    the file.
+    """
+
+    def __init__(self, file_path: str, compression: str = 'snappy'):
+        """
+        Initialize the file writer.
+
+        Args:
+            file_path (str): Output path; its extension selects the format
+            compression (str): Parquet compression codec (default: 'snappy'); Arrow files are
+                written uncompressed so readers can memory-map them
+
+        Raises:
+            ValueError: If the extension is not a supported columnar format
+        """
+        self.logger = setup_logger(__name__)
+        self.file_path = Path(file_path)
+        suffix = self.file_path.suffix.lower()
+        if suffix in PARQUET_EXTENSIONS:
+            self.format = 'parquet'
+        elif suffix in ARROW_EXTENSIONS:
+            self.format = 'arrow'
+        else:
+            raise ValueError(f"Unsupported output format {suffix!r}, expected one of {PARQUET_EXTENSIONS + ARROW_EXTENSIONS}")
+        self.compression = compression
+        self.rows_written = 0
+        self._writer = None
+        self._sink = None
+        self.logger.info("PredictionFileWriter initialized", extra={
+            "file_path": str(self.file_path),
+            "format": self.format
+        })
+
+    def _open(self, schema):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.format == 'parquet':
+            self._writer = pq.ParquetWriter(self.file_path, schema, compression=self.compression)
+        else:
+            self._sink = pa.OSFile(str(self.file_path), 'wb')
+            self._writer = pa.ipc.new_file(self._sink, schema)
+
+    def write_predictions(self, df: "pd.DataFrame", prediction_date: Optional[datetime] = None) -> None:
+        """
+        Append prediction results to the file.
+
+        Args:
+            df (pd.DataFrame): DataFrame containing prediction results with columns ['id', 'predict_result']
+            prediction_date (Optional[datetime]): Date stored with the rows (default: today)
+
+        Raises:
+            Exception: If there's an error writing the data
+        """
+        import pyarrow as pa
+        try:
+            required_columns = ['id', 'predict_result']
+            if not all(col in df.columns for col in required_columns):
+                raise ValueError(f"DataFrame must contain columns: {required_columns}")
+
+            date = (prediction_date or datetime.now()).date()
+            table = pa.table({
+                'id': pa.array(df['id'].to_numpy(), type=pa.int64()),
+                'predict_result': pa.array(df['predict_result'].to_numpy(), type=pa.int64()),
+                'prediction_date': pa.array([date] * len(df), type=pa.date32())
+            })
+            if self._writer is None:
+                self._open(table.schema)
+            self._writer.write_table(table)
+            self.rows_written += len(df)
+
+            self.logger.info("Predictions written to file", extra={
+                "file_path": str(self.file_path),
+                "rows": len(df),
+                "total_rows": self.rows_written
+            })
+        except Exception as e:
+            self.logger.error("Error writing predictions to file", extra={
+                "error": str(e),
+                "file_path": str(self.file_path)
+            }, exc_info=True)
+            raise Exception(f"Error writing predictions to {self.file_path}: {str(e)}")
+
+    def close(self) -> None:
+        """Finish the file. Closing a writer that never received rows is a no-op."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def __enter__(self) -> "PredictionFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()